@@ -1,12 +1,23 @@
 from flask import Flask, render_template, request # Added request
+from werkzeug.utils import import_string
 import os
 from dotenv import load_dotenv
 import hashlib
+from functools import lru_cache
 from extensions import db, login_manager, ckeditor, bootstrap, migrate
 from flask_login import current_user # Import current_user
 import smtplib
+import threading
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 
 # --- Global Helper Functions & Configuration ---
+@lru_cache(maxsize=4096)
+def _gravatar_hash(email_normalized):
+    """Returns the SHA-256 Gravatar hash for a trimmed, lowercased email. Bounded so bot traffic can't grow it forever."""
+    return hashlib.sha256(email_normalized.encode('utf-8')).hexdigest()
+
+@lru_cache(maxsize=4096)
 def generate_gravatar_url(email, size=80, default_image='mp', rating='g'):
     """
     Generates a Gravatar URL for a given email address.
@@ -17,14 +28,115 @@ def generate_gravatar_url(email, size=80, default_image='mp', rating='g'):
     :param rating: Rating of the avatar (e.g., 'g', 'pg', 'r', 'x').
     :return: The Gravatar URL (string).
     """
-    if email is None: # Handle None email gracefully
-        email = ''
-    email_hash = hashlib.md5(email.lower().encode('utf-8')).hexdigest()
+    email_hash = _gravatar_hash((email or '').strip().lower()) # Handle None email gracefully
     # Always use HTTPS for Gravatar URLs
     return f"https://www.gravatar.com/avatar/{email_hash}?s={size}&d={default_image}&r={rating}"
 
 load_dotenv() # It's common to load dotenv at the module level or early in create_app
 
+# --- Mail Configuration ---
+# Read once at import time instead of on every contact form submission.
+MAIL_SERVER = os.environ.get('MAIL_SERVER')
+MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
+MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
+MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+MAIL_RECEIVER = os.environ.get('MAIL_RECEIVER')
+
+# Cached SMTP connection, shared by all threads of this worker process.
+_smtp_lock = threading.Lock()
+_smtp_conn = None
+
+def _open_smtp():
+    """Opens a new authenticated SMTP connection."""
+    server = smtplib.SMTP(MAIL_SERVER, MAIL_PORT)
+    server.starttls()
+    server.login(MAIL_USERNAME, MAIL_PASSWORD)
+    return server
+
+def _get_smtp():
+    """
+    Returns the cached SMTP connection, reconnecting if it is no longer alive.
+    Must be called with _smtp_lock held.
+    """
+    global _smtp_conn
+    if _smtp_conn is not None:
+        try:
+            _smtp_conn.noop()
+            return _smtp_conn
+        except Exception:
+            _smtp_conn = None
+    _smtp_conn = _open_smtp()
+    return _smtp_conn
+
+def _send_mail(message, reuse=True):
+    """Sends a message to MAIL_RECEIVER, reusing the cached SMTP connection if enabled."""
+    global _smtp_conn
+    if not reuse:
+        with smtplib.SMTP(MAIL_SERVER, MAIL_PORT) as server:
+            server.starttls()
+            server.login(MAIL_USERNAME, MAIL_PASSWORD)
+            server.sendmail(MAIL_USERNAME, MAIL_RECEIVER, message)
+        return
+
+    with _smtp_lock:
+        try:
+            _get_smtp().sendmail(MAIL_USERNAME, MAIL_RECEIVER, message)
+        except smtplib.SMTPServerDisconnected:
+            # The server dropped us between noop() and sendmail(); retry once on a fresh connection.
+            _smtp_conn = None
+            _get_smtp().sendmail(MAIL_USERNAME, MAIL_RECEIVER, message)
+
+def _send_contact_email(name, email_from, phone, message_body, reuse=True):
+    """Builds and sends the contact form email. Runs on the mail thread pool, so failures are only logged."""
+    email_subject = f"New Contact Form Submission from {name} (Main Site)"
+    full_email_message = (
+        f"Subject: {email_subject}\n\n"
+        f"Name: {name}\nEmail: {email_from}\nPhone: {phone if phone else 'Not provided'}\n\nMessage:\n{message_body}\n"
+    )
+
+    try:
+        _send_mail(full_email_message.encode('utf-8'), reuse=reuse)
+    except Exception as e:
+        print(f"Error sending email from main contact form: {e}")
+
+# Contact form emails are sent off the request thread so SMTP latency never blocks a worker.
+_mail_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mail")
+
+@atexit.register
+def _close_smtp():
+    """Closes the cached SMTP connection on interpreter shutdown."""
+    global _smtp_conn
+    with _smtp_lock:
+        if _smtp_conn is not None:
+            try:
+                _smtp_conn.quit()
+            except Exception:
+                pass
+            _smtp_conn = None
+
+# Registered after _close_smtp so that (atexit being LIFO) in-flight sends drain before the connection closes.
+atexit.register(_mail_pool.shutdown, wait=True)
+
+# --- Blueprints ---
+# (import path, url_prefix). A url_prefix of None keeps the prefix set on the blueprint itself.
+# Flask needs every URL rule before the first request, so the blueprint objects must be imported here;
+# blueprint packages keep their own heavy dependencies (LangGraph, OpenAI, ...) out of module scope.
+BLUEPRINTS = [
+    ("blog_project.main:blog_bp", '/blog_project'),
+    ("vapi_todo:vapi_flask_bp", None),
+    ("syfw_todo:syfw_todo_bp", None), # This import might need adjustment if it has websockets too
+    ("blnd_todo.routes:blnd_todo_bp", None),
+    ("lgch_todo:lgch_todo_bp", None),
+]
+
+def register_blueprint(app, import_path, url_prefix=None):
+    """Imports a blueprint from a 'module:attribute' path and registers it on the app."""
+    blueprint = import_string(import_path)
+    if url_prefix is None:
+        app.register_blueprint(blueprint)
+    else:
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
+
 def create_app():
     app = Flask(__name__)
 
@@ -33,6 +145,8 @@ def create_app():
     # Centralized database configuration
     app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get("DB_URI")
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Reuse a single SMTP connection per worker for the contact form (set SMTP_REUSE=false to disable)
+    app.config['SMTP_REUSE'] = os.environ.get('SMTP_REUSE', 'true').lower() == 'true'
 
     # Initialize extensions
 
@@ -56,20 +170,8 @@ def create_app():
     # --- Register Blueprints ---
     # Import and register blueprints after all extensions are fully configured.
     # This prevents circular dependencies where blueprint code might need an initialized extension.
-    from blog_project.main import blog_bp
-    app.register_blueprint(blog_bp, url_prefix='/blog_project')
-
-    from vapi_todo import vapi_flask_bp
-    app.register_blueprint(vapi_flask_bp) # The url_prefix is already set in routes.py
-
-    from syfw_todo import syfw_todo_bp # This import might need adjustment if it has websockets too
-    app.register_blueprint(syfw_todo_bp)
-
-    from blnd_todo.routes import blnd_todo_bp
-    app.register_blueprint(blnd_todo_bp)
-
-    from lgch_todo import lgch_todo_bp
-    app.register_blueprint(lgch_todo_bp)
+    for import_path, url_prefix in BLUEPRINTS:
+        register_blueprint(app, import_path, url_prefix)
 
     # --- Main Application Routes ---
     @app.route('/', methods=["GET", "POST"])
@@ -86,31 +188,15 @@ def create_app():
             if not all([name, email_from, message_body]):
                 error_message = "Please fill in all required fields (Name, Email, Message)."
             else:
-                mail_server = os.environ.get('MAIL_SERVER')
-                mail_port = int(os.environ.get('MAIL_PORT', 587))
-                mail_username = os.environ.get('MAIL_USERNAME')
-                mail_password = os.environ.get('MAIL_PASSWORD')
-                mail_receiver = os.environ.get('MAIL_RECEIVER')
-
-                if not all([mail_server, mail_username, mail_password, mail_receiver]):
+                if not all([MAIL_SERVER, MAIL_USERNAME, MAIL_PASSWORD, MAIL_RECEIVER]):
                     print("Email configuration is incomplete for main contact form.")
                     error_message = "Message could not be sent due to a server configuration issue."
                 else:
-                    email_subject = f"New Contact Form Submission from {name} (Main Site)"
-                    full_email_message = (
-                        f"Subject: {email_subject}\n\n"
-                        f"Name: {name}\nEmail: {email_from}\nPhone: {phone if phone else 'Not provided'}\n\nMessage:\n{message_body}\n"
+                    _mail_pool.submit(
+                        _send_contact_email, name, email_from, phone, message_body,
+                        reuse=app.config['SMTP_REUSE']
                     )
-
-                    try:
-                        with smtplib.SMTP(mail_server, mail_port) as server:
-                            server.starttls()
-                            server.login(mail_username, mail_password)
-                            server.sendmail(mail_username, mail_receiver, full_email_message.encode('utf-8'))
-                        msg_sent = True
-                    except Exception as e:
-                        print(f"Error sending email from main contact form: {e}")
-                        error_message = "An unexpected error occurred. Please try again later."
+                    msg_sent = True
 
         # Always render index.html, passing the status of the form submission
         # The 'current_user' is available globally via the context_processor, so no need to pass it here.
@@ -0,0 +1,26 @@
+"""
+Gunicorn configuration for the Flask application (app:app).
+
+The app is imported once in the master and workers are forked from it, so the
+blueprint imports are paid once and shared copy-on-write between workers.
+Usage: gunicorn app:app
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+
+# Import app.py (and every blueprint) in the master before forking workers
+preload_app = True
+
+workers = int(os.environ.get("GUNICORN_WORKERS", max(2, multiprocessing.cpu_count())))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Agent runs can take a while (LLM + tool calls)
+timeout = 120
+
+# Recycle workers periodically to bound memory growth from long-lived caches
+max_requests = 2000
+max_requests_jitter = 200
@@ -0,0 +1,85 @@
+"""
+Process-wide agent registry shared by the Flask routes and the Twilio WebSocket handler.
+
+MCP tool discovery (which boots every configured MCP server) and graph compilation happen once
+per process; later callers get the same compiled graph.
+"""
+
+import asyncio
+import copy
+import json
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, List, Optional
+
+if TYPE_CHECKING:
+    from langchain_core.tools import BaseTool
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+    from langgraph.graph.state import CompiledStateGraph
+
+# MCP servers run from the project root (where app.py is located)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MCP_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mcps', 'mcp_config.json')
+
+_CLIENT: Optional["MultiServerMCPClient"] = None
+_TOOLS: Optional[List["BaseTool"]] = None
+_GRAPH: Optional["CompiledStateGraph"] = None
+_lock: Optional[asyncio.Lock] = None
+_pid: Optional[int] = None
+
+
+@lru_cache(maxsize=1)
+def _read_mcp_connections() -> dict[str, Any]:
+    """Read mcp_config.json and resolve each server's script path and cwd against the project root.
+
+    The file is static per deploy, so it is read (and the fallback path probed) once per process.
+    The cached dict is shared; go through _load_mcp_connections() to get a copy.
+    """
+    config_path = MCP_CONFIG_PATH
+    if not os.path.exists(config_path):
+        # Fallback path for when running from the root directory
+        config_path = os.path.join('lgch_todo', 'mcps', 'mcp_config.json')
+
+    with open(config_path) as f:
+        mcp_config = json.load(f)
+
+    # Absolute script paths and an explicit cwd instead of changing this process's working directory
+    for server_config in mcp_config["mcpServers"].values():
+        if "args" in server_config and len(server_config["args"]) > 0:
+            relative_path = server_config["args"][0]
+            if not os.path.isabs(relative_path):
+                server_config["args"][0] = os.path.join(PROJECT_ROOT, relative_path)
+        server_config.setdefault("cwd", PROJECT_ROOT)
+        env = server_config.get("env")
+        if env and "PYTHONPATH" in env:
+            env["PYTHONPATH"] = os.pathsep.join(
+                os.path.join(PROJECT_ROOT, entry) for entry in env["PYTHONPATH"].split(os.pathsep)
+            )
+    return mcp_config["mcpServers"]
+
+
+def _load_mcp_connections() -> dict[str, Any]:
+    """Return a copy of the resolved MCP server connections that the caller may mutate freely."""
+    return copy.deepcopy(_read_mcp_connections())
+
+
+async def get_shared_agent() -> "CompiledStateGraph":
+    """Return this process's agent graph, discovering the MCP tools and compiling it on first use."""
+    global _CLIENT, _TOOLS, _GRAPH, _lock, _pid
+    if _pid != os.getpid():
+        # Forked from a process that already built (or was building) the agent; start over
+        _CLIENT = _TOOLS = _GRAPH = None
+        _lock = asyncio.Lock()
+        _pid = os.getpid()
+    if _GRAPH is not None:
+        return _GRAPH
+
+    async with _lock:
+        if _GRAPH is None:
+            from langchain_mcp_adapters.client import MultiServerMCPClient
+            from .assistant_graph_todo import get_agent_graph
+
+            client = MultiServerMCPClient(connections=_load_mcp_connections())
+            tools = await client.get_tools()
+            _CLIENT, _TOOLS, _GRAPH = client, tools, get_agent_graph(tools)
+    return _GRAPH
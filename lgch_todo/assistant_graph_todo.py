@@ -1,9 +1,11 @@
 import logging
+from functools import lru_cache
 from langchain_core.tools import BaseTool
-from langchain_core.messages import SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, RemoveMessage
 from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import ToolNode, tools_condition
 from langgraph.graph import StateGraph
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.checkpoint.memory import InMemorySaver
 from typing import List
@@ -15,6 +17,15 @@ from .mcps.local_servers.db_todo import TodoPriority, ReminderImportance
 
 load_dotenv()
 
+# Allowed values injected into the system prompt; the enums are static
+_TODO_PRIORITIES_STR = ", ".join(p.value for p in TodoPriority)
+_REMINDER_IMPORTANCE_STR = ", ".join(i.value for i in ReminderImportance)
+
+# Checkpoint durability used when streaming the graph. The InMemorySaver only needs the thread state
+# between turns, so writing the checkpoint once when a run exits skips serializing the whole message
+# list after every assistant/tools step.
+CHECKPOINT_DURABILITY = "exit"
+
 # Configure logging to suppress HTTP request logs
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("openai").setLevel(logging.WARNING)
@@ -61,48 +72,87 @@ class TodoAgent:
 
             Available tools:
             - create_todo: Create a new todo item with title, description, priority, and optional due date
-            - get_todos: Get all todo items
+            - bulk_create_todos: Create several todo items in one call (use this instead of repeated create_todo)
+            - get_todos: Get todo items, newest first (paged: pass next_cursor back as cursor for more)
             - complete_todo: Mark a todo as completed
             - update_todo: Update todo properties (title, description, priority, due_date, completed status)
             - delete_todo: Delete a todo item
             - create_reminder: Create a new reminder with text, importance, and optional reminder date
-            - get_reminders: Get all reminders
+            - bulk_create_reminders: Create several reminders in one call (use this instead of repeated create_reminder)
+            - get_reminders: Get reminders, newest first (paged like get_todos)
             - delete_reminder: Delete a reminder
             - create_calendar_event: Create a calendar event with title, start/end times, and description
-            - get_calendar_events: Get all calendar events
+            - get_calendar_events: Get calendar events, newest first (paged like get_todos)
             - delete_calendar_event: Delete a calendar event
             - query_db: Execute custom SQL queries on the database
 
             When users ask about their productivity, help them organize their tasks, set priorities, and manage their time effectively.
             """,
+            max_turns: int = 6,
             ) -> None:
         self.name = name
         self.system_prompt = system_prompt
         self.model = model
         self.tools = tools
+        self.max_turns = max_turns
+
+        # inject todo priorities and reminder importance into the system prompt once
+        self._system_message = SystemMessage(
+            id="lgch-system-prompt",
+            content=self.system_prompt.format(
+                todo_priorities=_TODO_PRIORITIES_STR,
+                reminder_importance=_REMINDER_IMPORTANCE_STR
+                ),
+            )
 
         self.llm = ChatOpenAI(name=self.name, model=model).bind_tools(tools=self.tools)
         self.graph = self.build_graph()
 
+    def recent_turns(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """The system prompt plus the last `max_turns` user turns (each with its assistant and tool messages).
+
+        Cutting at a HumanMessage keeps tool calls and their results together.
+        """
+        turns = 0
+        for start in range(len(messages) - 1, -1, -1):
+            if isinstance(messages[start], HumanMessage):
+                turns += 1
+                if turns == self.max_turns:
+                    break
+        else:
+            return messages
+        if start == 0 or not isinstance(messages[0], SystemMessage):
+            return messages[start:]
+        return [messages[0], *messages[start:]]
+
     def build_graph(self,) -> CompiledStateGraph:
         builder = StateGraph(AgentState)
 
-        def assistant(state: AgentState):
-            """The main assistant node that uses the LLM to generate responses."""
-            # inject todo priorities and reminder importance into the system prompt
-            system_prompt = self.system_prompt.format(
-                todo_priorities=", ".join([p.value for p in TodoPriority]),
-                reminder_importance=", ".join([i.value for i in ReminderImportance])
-                )
+        def has_system_message(state: AgentState) -> str:
+            """Routes new threads through `seed` so the system prompt is stored in the thread state exactly once."""
+            if state.messages and isinstance(state.messages[0], SystemMessage):
+                return "assistant"
+            return "seed"
 
-            response = self.llm.invoke([SystemMessage(content=system_prompt)] + state.messages)
-            state.messages.append(response)
-            return state
+        def seed(state: AgentState):
+            """Puts the system prompt in front of the first user message of a new thread."""
+            return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), self._system_message, *state.messages]}
 
+        async def assistant(state: AgentState):
+            """The main assistant node that uses the LLM to generate responses."""
+            # Long calls keep their full history in the checkpoint, but the model only sees recent turns
+            response = await self.llm.ainvoke(self.recent_turns(state.messages))
+            # only return the new message; the add_messages reducer appends it to the thread
+            return {"messages": [response]}
+
+        builder.add_node(seed)
         builder.add_node(assistant)
+        # When run via astream/ainvoke, ToolNode dispatches all tool calls of one LLM turn concurrently
+        # (asyncio.gather), so e.g. get_todos + get_reminders cost max(latency) rather than the sum.
         builder.add_node(ToolNode(self.tools))
 
-        builder.set_entry_point("assistant")
+        builder.set_conditional_entry_point(has_system_message, ["seed", "assistant"])
+        builder.add_edge("seed", "assistant")
         builder.add_conditional_edges(
             "assistant",
             tools_condition
@@ -118,7 +168,25 @@ class TodoAgent:
 
         return Image(self.graph.get_graph().draw_mermaid_png())
 
-agent = TodoAgent()
+# The most recently compiled graph, keyed on the sorted tool names it was built with.
+_graph_cache: dict = {}
+
+
+def get_agent_graph(tools: List[BaseTool]) -> CompiledStateGraph:
+    """Returns a compiled agent graph for the given tools, reusing the cached one while the tool names are unchanged."""
+    tools_key = tuple(sorted(tool.name for tool in tools))
+    graph = _graph_cache.get(tools_key)
+    if graph is None:
+        graph = TodoAgent(tools=tools).graph
+        _graph_cache.clear()
+        _graph_cache[tools_key] = graph
+    return graph
+
+
+@lru_cache(maxsize=1)
+def get_agent() -> TodoAgent:
+    """Returns the default tool-less agent, built on first use rather than at import time."""
+    return TodoAgent()
 
 if __name__ == "__main__":
-    agent.draw_graph()
+    get_agent().draw_graph()
@@ -1,3 +1,7 @@
+-- Create enum types for todo priority and reminder importance
+create type public.todo_priority as enum ('low', 'medium', 'high', 'urgent');
+create type public.reminder_importance as enum ('low', 'medium', 'high', 'urgent');
+
 -- Create todos_lgch table
 create table public.todos_lgch (
   id uuid not null default gen_random_uuid (),
@@ -6,7 +10,7 @@ create table public.todos_lgch (
   title text not null,
   description text null,
   completed boolean not null default false,
-  priority text not null default 'medium'::text,
+  priority public.todo_priority not null default 'medium',
   due_date timestamp with time zone null,
   google_calendar_event_id text null,
   constraint todos_lgch_pkey primary key (id)
@@ -18,7 +22,7 @@ create table public.reminders_lgch (
   created_at timestamp with time zone not null default now(),
   updated_at timestamp with time zone not null default now(),
   reminder_text text not null,
-  importance text not null default 'medium'::text,
+  importance public.reminder_importance not null default 'medium',
   reminder_date timestamp with time zone null,
   google_calendar_event_id text null,
   constraint reminders_lgch_pkey primary key (id)
@@ -54,30 +58,33 @@ create table public.call_recordings_lgch (
 ) TABLESPACE pg_default;
 
 -- Create indexes for better performance
-create index idx_todos_lgch_created_at on public.todos_lgch (created_at);
 create index idx_todos_lgch_completed on public.todos_lgch (completed);
 create index idx_todos_lgch_priority on public.todos_lgch (priority);
 create index idx_todos_lgch_due_date on public.todos_lgch (due_date);
 
-create index idx_reminders_lgch_created_at on public.reminders_lgch (created_at);
 create index idx_reminders_lgch_importance on public.reminders_lgch (importance);
 create index idx_reminders_lgch_reminder_date on public.reminders_lgch (reminder_date);
 
-create index idx_calendar_events_lgch_created_at on public.calendar_events_lgch (created_at);
 create index idx_calendar_events_lgch_event_from on public.calendar_events_lgch (event_from);
 create index idx_calendar_events_lgch_event_to on public.calendar_events_lgch (event_to);
 
-create index idx_call_recordings_lgch_created_at on public.call_recordings_lgch (created_at);
 create index idx_call_recordings_lgch_call_sid on public.call_recordings_lgch (call_sid);
 create index idx_call_recordings_lgch_from_number on public.call_recordings_lgch (from_number);
 create index idx_call_recordings_lgch_status on public.call_recordings_lgch (status);
 
--- Add check constraints for valid values
-alter table public.todos_lgch add constraint todos_lgch_priority_check 
-  check (priority in ('low', 'medium', 'high', 'urgent'));
+-- Newest-first keyset pages of the list tools (safe to run against an existing database)
+create index if not exists idx_todos_lgch_created_at_id on public.todos_lgch (created_at desc, id desc);
+create index if not exists idx_reminders_lgch_created_at_id on public.reminders_lgch (created_at desc, id desc);
+create index if not exists idx_calendar_events_lgch_created_at_id on public.calendar_events_lgch (created_at desc, id desc);
+create index if not exists idx_call_recordings_lgch_created_at_id on public.call_recordings_lgch (created_at desc, id desc);
 
-alter table public.reminders_lgch add constraint reminders_lgch_importance_check 
-  check (importance in ('low', 'medium', 'high', 'urgent'));
+-- Google Calendar event id lookups (safe to run against an existing database)
+create index if not exists idx_todos_lgch_google_calendar_event_id on public.todos_lgch (google_calendar_event_id)
+  where google_calendar_event_id is not null;
+create index if not exists idx_reminders_lgch_google_calendar_event_id on public.reminders_lgch (google_calendar_event_id)
+  where google_calendar_event_id is not null;
+create index if not exists idx_calendar_events_lgch_google_calendar_event_id on public.calendar_events_lgch (google_calendar_event_id)
+  where google_calendar_event_id is not null;
 
 -- Add check constraint for event times
 alter table public.calendar_events_lgch add constraint calendar_events_lgch_time_check 
@@ -92,3 +99,5 @@ alter table public.call_recordings_lgch add constraint call_recordings_lgch_dura
 
 alter table public.call_recordings_lgch add constraint call_recordings_lgch_file_size_check 
   check (file_size_bytes is null or file_size_bytes >= 0);
+
+-- Existing databases created with text priority/importance columns: run migrate_enum_columns.sql
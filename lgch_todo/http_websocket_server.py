@@ -6,11 +6,20 @@ Handles both HTTP requests (for ngrok health checks) and WebSocket connections.
 
 import asyncio
 import logging
+import multiprocessing
+import signal
+import socket
 import sys
 import os
-from aiohttp import web, WSMsgType
+from aiohttp import web
 import aiohttp
 
+try:
+    # libuv-based event loop; optional, falls back to the stdlib loop
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -20,65 +29,46 @@ logger = logging.getLogger(__name__)
 
 # Import the proper Twilio handler with AI integration
 from lgch_todo.twilio_handler import twilio_handler
+from lgch_todo.voice_utils import warm_up_openai
+
+# Bind address and process count. With more than one worker every process binds the same
+# port via SO_REUSEPORT and the kernel spreads incoming connections across them.
+HOST = os.getenv('WEBSOCKET_HOST', 'localhost')
+PORT = int(os.getenv('WEBSOCKET_PORT', 5001))
+WORKERS = int(os.getenv('WEBSOCKET_WORKERS', 1))
+BACKLOG = 2048
+REUSE_PORT = hasattr(socket, "SO_REUSEPORT")
+WS_HEARTBEAT = 20.0
+
+# Health check response body, encoded once, with a static ETag so repeat probes can get a 304
+_HEALTH_BODY = b"WebSocket server is running"
+_HEALTH_ETAG = "lgch-hc-1"
+_HEALTH_HEADERS = {"Content-Type": "text/plain", "ETag": f'"{_HEALTH_ETAG}"'}
+_NOT_MODIFIED_HEADERS = {"ETag": f'"{_HEALTH_ETAG}"'}
 
 async def http_handler(request):
     """Handle HTTP requests (for ngrok health checks)."""
-    logger.info(f"HTTP request from {request.remote}: {request.method} {request.path}")
-    return web.Response(
-        text="WebSocket server is running",
-        content_type="text/plain",
-        status=200
-    )
+    # ngrok probes this constantly; only log it when debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("HTTP request from %s: %s %s", request.remote, request.method, request.path)
+    for etag in request.if_none_match or ():
+        if etag.value in (_HEALTH_ETAG, "*"):
+            return web.Response(status=304, headers=_NOT_MODIFIED_HEADERS)
+    return web.Response(body=_HEALTH_BODY, headers=_HEALTH_HEADERS)
 
 async def websocket_handler(request):
     """Handle WebSocket connections from Twilio."""
-    logger.info(f"WebSocket connection attempt from {request.remote}")
+    logger.info("WebSocket connection attempt from %s", request.remote)
     
-    ws = web.WebSocketResponse()
+    # aiohttp answers pings and sends its own every WS_HEARTBEAT seconds, so handlers needn't ping
+    ws = web.WebSocketResponse(heartbeat=WS_HEARTBEAT)
     await ws.prepare(request)
     
-    logger.info(f"WebSocket connection established with {request.remote}")
+    logger.info("WebSocket connection established with %s", request.remote)
     
     try:
-        # Create a wrapper to make aiohttp WebSocket compatible with twilio_handler
-        class WebSocketWrapper:
-            def __init__(self, aiohttp_ws):
-                self.ws = aiohttp_ws
-                self._closed = False
-            
-            async def __aiter__(self):
-                return self
-            
-            async def __anext__(self):
-                if self._closed:
-                    raise StopAsyncIteration
-                
-                try:
-                    msg = await self.ws.receive()
-                    if msg.type == WSMsgType.TEXT:
-                        return msg.data
-                    elif msg.type == WSMsgType.ERROR:
-                        logger.error(f'WebSocket error: {self.ws.exception()}')
-                        self._closed = True
-                        raise StopAsyncIteration
-                    elif msg.type == WSMsgType.CLOSE:
-                        logger.info('WebSocket connection closed')
-                        self._closed = True
-                        raise StopAsyncIteration
-                    else:
-                        # Skip other message types
-                        return await self.__anext__()
-                except Exception as e:
-                    logger.error(f"Error receiving WebSocket message: {e}")
-                    self._closed = True
-                    raise StopAsyncIteration
-            
-            async def send(self, data):
-                await self.ws.send_str(data)
-        
-        # Use the wrapper with the AI-integrated handler
-        wrapped_ws = WebSocketWrapper(ws)
-        await twilio_handler(wrapped_ws)
+        # twilio_handler iterates the aiohttp WebSocketResponse directly
+        await twilio_handler(ws)
         
     except Exception as e:
         logger.error(f"Error in WebSocket handler: {e}")
@@ -91,7 +81,7 @@ async def websocket_handler(request):
 
 async def main():
     """Start the hybrid HTTP/WebSocket server."""
-    logger.info("Starting Twilio Media Streams server on localhost:5001")
+    logger.info(f"Starting Twilio Media Streams server on {HOST}:{PORT}")
     
     # Create aiohttp app
     app = web.Application()
@@ -102,22 +92,56 @@ async def main():
     app.router.add_get('/health', http_handler)
     
     # Start server
-    runner = web.AppRunner(app)
+    # No per-request access log: health probes and the long-lived Twilio stream don't need one
+    runner = web.AppRunner(app, access_log=None)
     await runner.setup()
-    site = web.TCPSite(runner, 'localhost', 5001)
+    site = web.TCPSite(runner, HOST, PORT, backlog=BACKLOG, reuse_port=REUSE_PORT or None)
     await site.start()
     
-    logger.info("HTTP/WebSocket server started successfully on localhost:5001")
+    logger.info(f"HTTP/WebSocket server started successfully on {HOST}:{PORT} (pid {os.getpid()})")
+
+    # Have a keep-alive connection to OpenAI (and a warm TTS model) ready before the first call
+    warm_up_task = asyncio.create_task(warm_up_openai())
     logger.info("Ready to accept Twilio Media Streams connections...")
     logger.info("Server will handle: HTTP requests and WebSocket connections")
     
-    # Keep the server running
-    try:
-        while True:
-            await asyncio.sleep(1)
-    except KeyboardInterrupt:
-        logger.info("Shutting down server...")
-        await runner.cleanup()
+    # Keep the server running until SIGINT/SIGTERM
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows event loops have no add_signal_handler; a plain handler wakes the loop instead
+            signal.signal(sig, lambda signum, frame: loop.call_soon_threadsafe(stop.set))
+    
+    await stop.wait()
+    logger.info("Shutting down server...")
+    await runner.cleanup()
+
+def run():
+    """Runs the server in the current process."""
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if WORKERS > 1 and REUSE_PORT:
+        # Each process runs its own event loop
+        processes = [multiprocessing.Process(target=run, name=f"ws-worker-{i}") for i in range(WORKERS)]
+        for process in processes:
+            process.start()
+
+        def stop_workers(signum, frame):
+            # start_servers.py signals only this pid, so pass the stop on to every worker
+            for process in processes:
+                process.terminate()
+
+        # Installed after the workers start so they keep their own handlers
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, stop_workers)
+        for process in processes:
+            process.join()
+    else:
+        run()
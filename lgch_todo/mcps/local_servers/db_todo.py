@@ -1,25 +1,59 @@
 from mcp.server.fastmcp import FastMCP
 from dotenv import load_dotenv
 from typing import List, Optional
-from sqlalchemy import ForeignKey, String, text
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, Session
+from sqlalchemy import Enum as SAEnum, ForeignKey, Index, String, bindparam, insert, select, text, update
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from uuid import UUID, uuid4
 from datetime import datetime, timedelta, timezone
+from contextlib import asynccontextmanager
+import asyncio
+import atexit
+import logging
 import os
-from pydantic import BaseModel
+import queue
+import re
+from logging.handlers import QueueHandler, QueueListener
+from pydantic import BaseModel, TypeAdapter
 from enum import StrEnum
-import pandas as pd
-try:
-    from google_calendar import get_calendar_service
-except ImportError:
-    # Fallback for when running as MCP server
-    import sys
-    import os
-    sys.path.append(os.path.dirname(__file__))
-    from google_calendar import get_calendar_service
+import orjson
+from decimal import Decimal
+import sys
+
+# google_calendar lives next to this file; make it importable when running as an MCP server.
+# It is imported lazily (see _get_calendar_service) since googleapiclient is slow to import.
+sys.path.append(os.path.dirname(__file__))
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# ----------------------------
+# Enums
+# ----------------------------
+
+class TodoPriority(StrEnum):
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+    URGENT = "urgent"
+
+
+class ReminderImportance(StrEnum):
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+    URGENT = "urgent"
+
+
+def _pg_enum(enum_cls: type[StrEnum], name: str) -> SAEnum:
+    """A native PostgreSQL ENUM column type that stores the enum's values (not its member names)."""
+    return SAEnum(enum_cls, name=name, values_callable=lambda members: [m.value for m in members])
+
+def _newest_first_index(table: str) -> Index:
+    """The (created_at DESC, id DESC) index that serves the list tools' keyset pages."""
+    return Index(f"idx_{table}_created_at_id", text("created_at DESC"), text("id DESC"))
+
 # ----------------------------
 # SQLAlchemy Models
 # ----------------------------
@@ -30,6 +64,14 @@ class Base(DeclarativeBase):
 
 class DBTodo(Base):
     __tablename__ = "todos_lgch"
+    __table_args__ = (
+        Index(
+            "idx_todos_lgch_google_calendar_event_id",
+            "google_calendar_event_id",
+            postgresql_where=text("google_calendar_event_id is not null"),
+        ),
+        _newest_first_index("todos_lgch"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True, server_default=text("gen_random_uuid()"))
     created_at: Mapped[datetime] = mapped_column(nullable=False, server_default=text("now()"))
@@ -37,25 +79,45 @@ class DBTodo(Base):
     title: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     completed: Mapped[bool] = mapped_column(nullable=False, server_default=text("false"))
-    priority: Mapped[str] = mapped_column(String, nullable=False, server_default=text("medium"))
+    priority: Mapped[TodoPriority] = mapped_column(
+        _pg_enum(TodoPriority, "todo_priority"), nullable=False, server_default=TodoPriority.MEDIUM.value
+    )
     due_date: Mapped[Optional[datetime]] = mapped_column(nullable=True)
     google_calendar_event_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
 
 class DBReminder(Base):
     __tablename__ = "reminders_lgch"
+    __table_args__ = (
+        Index(
+            "idx_reminders_lgch_google_calendar_event_id",
+            "google_calendar_event_id",
+            postgresql_where=text("google_calendar_event_id is not null"),
+        ),
+        _newest_first_index("reminders_lgch"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True, server_default=text("gen_random_uuid()"))
     created_at: Mapped[datetime] = mapped_column(nullable=False, server_default=text("now()"))
     updated_at: Mapped[datetime] = mapped_column(nullable=False, server_default=text("now()"), onupdate=datetime.now)
     reminder_text: Mapped[str] = mapped_column(String, nullable=False)
-    importance: Mapped[str] = mapped_column(String, nullable=False, server_default=text("medium"))
+    importance: Mapped[ReminderImportance] = mapped_column(
+        _pg_enum(ReminderImportance, "reminder_importance"), nullable=False, server_default=ReminderImportance.MEDIUM.value
+    )
     reminder_date: Mapped[Optional[datetime]] = mapped_column(nullable=True)
     google_calendar_event_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
 
 class DBCalendarEvent(Base):
     __tablename__ = "calendar_events_lgch"
+    __table_args__ = (
+        Index(
+            "idx_calendar_events_lgch_google_calendar_event_id",
+            "google_calendar_event_id",
+            postgresql_where=text("google_calendar_event_id is not null"),
+        ),
+        _newest_first_index("calendar_events_lgch"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True, server_default=text("gen_random_uuid()"))
     created_at: Mapped[datetime] = mapped_column(nullable=False, server_default=text("now()"))
@@ -69,6 +131,7 @@ class DBCalendarEvent(Base):
 
 class DBCallRecording(Base):
     __tablename__ = "call_recordings_lgch"
+    __table_args__ = (_newest_first_index("call_recordings_lgch"),)
 
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True, server_default=text("gen_random_uuid()"))
     created_at: Mapped[datetime] = mapped_column(nullable=False, server_default=text("now()"))
@@ -85,13 +148,6 @@ class DBCallRecording(Base):
 # Pydantic Models
 # ----------------------------
 
-class TodoPriority(StrEnum):
-    LOW = "low"
-    MEDIUM = "medium"
-    HIGH = "high"
-    URGENT = "urgent"
-
-
 class Todo(BaseModel):
     id: UUID
     created_at: datetime
@@ -104,13 +160,6 @@ class Todo(BaseModel):
     google_calendar_event_id: Optional[str]
 
 
-class ReminderImportance(StrEnum):
-    LOW = "low"
-    MEDIUM = "medium"
-    HIGH = "high"
-    URGENT = "urgent"
-
-
 class Reminder(BaseModel):
     id: UUID
     created_at: datetime
@@ -132,6 +181,19 @@ class CalendarEvent(BaseModel):
     google_calendar_event_id: Optional[str]
 
 
+class TodoCreate(BaseModel):
+    title: str
+    description: Optional[str] = None
+    priority: TodoPriority = TodoPriority.MEDIUM
+    due_date: Optional[datetime] = None
+
+
+class ReminderCreate(BaseModel):
+    reminder_text: str
+    importance: ReminderImportance = ReminderImportance.MEDIUM
+    reminder_date: Optional[datetime] = None
+
+
 class CallRecording(BaseModel):
     id: UUID
     created_at: datetime
@@ -148,11 +210,227 @@ class CallRecording(BaseModel):
 # DB Session
 # ----------------------------
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+# Connection pool limits, sized for concurrent MCP tool calls
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 20))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 40))
+
+
+def _async_db_url(url: str) -> str:
+    """Point a plain postgresql:// DB_URI at the async psycopg (v3) driver."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg://" + url[len(prefix):]
+    return url
+
+
+engine = create_async_engine(
+    _async_db_url(os.getenv("DB_URI")),
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+)
+# expire_on_commit=False keeps loaded attributes readable after commit without another round-trip
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+@asynccontextmanager
+async def _pipeline(session: AsyncSession):
+    """Run the enclosed statements in psycopg pipeline mode, so they share one network round trip.
+
+    Only for statements whose results aren't read (no RETURNING): SQLAlchemy fetches rows right
+    after executing, which would force a sync per statement anyway.
+    """
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    async with raw_connection.driver_connection.pipeline():
+        yield
+
+
+# Statements are built once at import so every call reuses SQLAlchemy's compiled-statement cache entry.
+# Primary-key lookups go through session.get(), which caches its own statement.
+_RECORDING_BY_SID = select(DBCallRecording).where(DBCallRecording.call_sid == bindparam("call_sid"))
+
+_INSERT_TODOS = insert(DBTodo).returning(DBTodo, sort_by_parameter_order=True)
+_INSERT_REMINDERS = insert(DBReminder).returning(DBReminder, sort_by_parameter_order=True)
+_INSERT_CALENDAR_EVENT_IDS = insert(DBCalendarEvent).returning(DBCalendarEvent.id, sort_by_parameter_order=True)
+
+_SET_GOOGLE_EVENT_ID = {
+    model: update(model.__table__)
+    .where(model.__table__.c.id == bindparam("row_id"))
+    .values(google_calendar_event_id=bindparam("google_event_id"))
+    for model in (DBTodo, DBReminder, DBCalendarEvent)
+}
+
+
+# Page size limits for the list tools
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def _keyset_page(model: type[Base]) -> tuple[TextClause, TextClause]:
+    """Build the queries for the first page of a table and for the pages after a cursor, newest first,
+    each returning the page as a JSON string serialized by PostgreSQL.
+
+    Pages are keyed on (created_at, id): the cursor is the id of the last row of the previous page.
+    The two pages get separate statements (rather than one with an "is the cursor null" branch) so
+    each plan, including the generic plan of a prepared statement, is a range scan of the
+    (created_at DESC, id DESC) index no matter how deep the page is.
+    """
+    table = model.__tablename__
+
+    def page(where: str) -> TextClause:
+        return text(f"""
+            SELECT json_build_object(
+                'items', COALESCE(json_agg(t ORDER BY t.created_at DESC, t.id DESC), '[]'::json),
+                'next_cursor', CASE WHEN count(*) = :limit THEN (array_agg(t.id ORDER BY t.created_at, t.id))[1] END
+            )::text
+            FROM (
+                SELECT * FROM {table}
+                {where}
+                ORDER BY created_at DESC, id DESC
+                LIMIT :limit
+            ) t
+        """)
+
+    return page(""), page(
+        f"WHERE (created_at, id) < (SELECT created_at, id FROM {table} WHERE id = CAST(:cursor AS uuid))"
+    )
+
+
+# The list tools send the DB's JSON straight back, so no ORM objects or Pydantic models are built per row
+_TODOS_PAGE = _keyset_page(DBTodo)
+_REMINDERS_PAGE = _keyset_page(DBReminder)
+_CALENDAR_EVENTS_PAGE = _keyset_page(DBCalendarEvent)
+_CALL_RECORDINGS_PAGE = _keyset_page(DBCallRecording)
+
+async def _fetch_page(statements: tuple[TextClause, TextClause], limit: int, cursor: Optional[UUID]) -> str:
+    """Return one page from a pair of _keyset_page statements."""
+    first_page, next_page = statements
+    params = {"limit": max(1, min(limit, MAX_PAGE_SIZE))}
+    async with SessionLocal() as session:
+        if cursor is None:
+            return await session.scalar(first_page, params)
+        return await session.scalar(next_page, {**params, "cursor": cursor})
+
+
+_TODO_LIST = TypeAdapter(List[Todo])
+_REMINDER_LIST = TypeAdapter(List[Reminder])
+
+
+def _construct_response(model: type[BaseModel], row: Base) -> BaseModel:
+    # Values come from typed DB columns, so build the response model without re-validating them
+    return model.model_construct(**row.__dict__)
+
+
+def _row_json(model: type[BaseModel], row: Base) -> str:
+    """Serialize a DB row through its Pydantic response model."""
+    return _construct_response(model, row).model_dump_json(indent=2)
+
+
+def _rows_json(adapter: TypeAdapter, model: type[BaseModel], rows: List[Base]) -> str:
+    """Serialize DB rows as one compact JSON array through their Pydantic response model."""
+    # A single dump_json call in pydantic-core; no indentation, which roughly halves the size of long lists
+    return adapter.dump_json([_construct_response(model, row) for row in rows]).decode()
+
+# ----------------------------
+# Google Calendar Sync
+# ----------------------------
+# Google Calendar calls run inside the tool call, after the DB write has committed: each adapter
+# tool call gets its own short-lived stdio server, which is terminated soon after the call returns,
+# so nothing may be left running in the background. The Google client is synchronous, so each call
+# runs in a worker thread.
+
+async def _update_returning(model: type[Base], where, values: dict) -> Optional[Base]:
+    """Apply an UPDATE and return the updated row from RETURNING, or None if no row matched."""
+    async with SessionLocal() as session, session.begin():
+        if not values:
+            return await session.scalar(select(model).where(where))
+        # The session is fresh, so there are no loaded objects to synchronize
+        return await session.scalar(
+            update(model).where(where).values(**values).returning(model),
+            execution_options={"synchronize_session": False},
+        )
+
+
+def _get_calendar_service():
+    # Deferred so tool calls that never touch Google Calendar don't pay for importing its client
+    from google_calendar import get_calendar_service
+    return get_calendar_service()
+
+
+async def _store_google_event_ids(rows: List[tuple]) -> None:
+    """Writes (model, row id, Google event id) triples back in one transaction and one round trip."""
+    params_by_model = {}
+    for model, row_id, google_event_id in rows:
+        params_by_model.setdefault(model, []).append({"row_id": row_id, "google_event_id": google_event_id})
+    if not params_by_model:
+        return
+    async with SessionLocal() as session, session.begin():
+        async with _pipeline(session):
+            for model, params in params_by_model.items():
+                await session.execute(_SET_GOOGLE_EVENT_ID[model], params)
+
+
+# Each helper runs after the DB write has committed, so it logs Google failures instead of raising them
+
+async def create_google_event(
+    title: str, description: str, start_time: datetime, end_time: datetime, rows: List[tuple]
+) -> Optional[str]:
+    """Creates a Google Calendar event and stores its id on the given (model, row id) rows."""
+    try:
+        calendar_service = await asyncio.to_thread(_get_calendar_service)
+        google_event_id = await asyncio.to_thread(
+            calendar_service.create_event,
+            title=title,
+            description=description,
+            start_time=start_time,
+            end_time=end_time,
+        )
+        if not google_event_id:
+            logger.warning("Google Calendar event creation returned None for: %s", title)
+            return None
+        await _store_google_event_ids([(model, row_id, google_event_id) for model, row_id in rows])
+        return google_event_id
+    except Exception:
+        logger.exception("Failed to create Google Calendar event")
+        return None
+
+
+async def create_google_events(events: List[dict]) -> List[Optional[str]]:
+    """Creates several Google Calendar events with batch requests and stores their ids on each event's rows.
 
-engine = create_engine(url=os.getenv("DB_URI"))
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Each event is a dict of title, description, start_time, end_time and rows; the returned ids are
+    in the same order (None where creation failed).
+    """
+    try:
+        calendar_service = await asyncio.to_thread(_get_calendar_service)
+        google_event_ids = await asyncio.to_thread(calendar_service.create_events, events)
+        await _store_google_event_ids([
+            (model, row_id, google_event_id)
+            for event, google_event_id in zip(events, google_event_ids) if google_event_id
+            for model, row_id in event["rows"]
+        ])
+        return google_event_ids
+    except Exception:
+        logger.exception("Failed to create Google Calendar events")
+        return [None] * len(events)
+
+
+async def update_google_event(event_id: str, title: str, description: str) -> None:
+    try:
+        calendar_service = await asyncio.to_thread(_get_calendar_service)
+        await asyncio.to_thread(calendar_service.update_event, event_id=event_id, title=title, description=description)
+    except Exception:
+        logger.exception("Failed to update Google Calendar event")
+
+
+async def delete_google_event(event_id: str) -> None:
+    try:
+        calendar_service = await asyncio.to_thread(_get_calendar_service)
+        await asyncio.to_thread(calendar_service.delete_event, event_id)
+    except Exception:
+        logger.exception("Failed to delete Google Calendar event")
 
 # ----------------------------
 # MCP Server
@@ -179,68 +457,111 @@ async def create_todo(
     Returns:
         The created todo item.
     """
-    with SessionLocal() as session:
-        # Set default due date to today if not provided
-        if due_date is None:
-            due_date = datetime.now(timezone.utc)
-            
+    # Set default due date to today if not provided
+    if due_date is None:
+        due_date = datetime.now(timezone.utc)
+
+    # Set default times for calendar event
+    start_time = due_date
+    end_time = start_time + timedelta(hours=1)
+    event_title = f"TODO: {title}"
+    event_description = f"{description or ''}\n\nPriority: {priority.value}\nFrom: LGCH Todo System"
+
+    # Todo and its calendar event are written in a single transaction
+    async with SessionLocal() as session, session.begin():
         new_todo = DBTodo(
             title=title,
             description=description,
-            priority=priority.value,
+            priority=priority,
             due_date=due_date,
             )
-        session.add(new_todo)
-        session.commit()
-        session.refresh(new_todo)
-        
-        # Create corresponding calendar event
-        try:
-            # Set default times for calendar event
-            start_time = due_date if due_date else datetime.now(timezone.utc)
-            end_time = start_time + timedelta(hours=1)
-            
-            # Create local calendar event
-            new_event = DBCalendarEvent(
-                title=f"TODO: {title}",
-                description=f"{description or ''}\n\nPriority: {priority.value}\nFrom: LGCH Todo System",
-                event_from=start_time,
-                event_to=end_time,
-            )
-            session.add(new_event)
-            session.commit()
-            session.refresh(new_event)
-            
-            # Sync with Google Calendar
-            calendar_service = get_calendar_service()
-            google_event_id = calendar_service.create_event(
-                title=f"TODO: {title}",
-                description=f"{description or ''}\n\nPriority: {priority.value}\nFrom: LGCH Todo System",
-                start_time=start_time,
-                end_time=end_time
-            )
-            if google_event_id:
-                new_event.google_calendar_event_id = google_event_id
-                new_todo.google_calendar_event_id = google_event_id
-                session.commit()
-                session.refresh(new_todo)
-                session.refresh(new_event)
-        except Exception as e:
-            print(f"Failed to create calendar event or sync with Google Calendar: {e}")
+        # Create corresponding local calendar event
+        new_event = DBCalendarEvent(
+            title=event_title,
+            description=event_description,
+            event_from=start_time,
+            event_to=end_time,
+        )
+        session.add_all([new_todo, new_event])
+        # One flush inserts both rows; server defaults (id, timestamps) come back via RETURNING
+        await session.flush()
     
-    return Todo.model_validate(new_todo.__dict__).model_dump_json(indent=2)
+    # Sync with Google Calendar; the event id is stored on both rows
+    google_event_id = await create_google_event(
+        title=event_title,
+        description=event_description,
+        start_time=start_time,
+        end_time=end_time,
+        rows=[(DBTodo, new_todo.id), (DBCalendarEvent, new_event.id)],
+    )
+    new_todo.google_calendar_event_id = google_event_id
+    
+    return _row_json(Todo, new_todo)
+
+@mcp.tool()
+async def bulk_create_todos(items: List[TodoCreate]) -> str:
+    """Create several todo items at once.
+    
+    Args:
+        items: The todo items to create, each with a title and optional description, priority and due_date.
+            If due_date is not specified, it defaults to today's date.
+
+    Returns:
+        The created todo items.
+    """
+    now = datetime.now(timezone.utc)
+    todo_rows, event_rows = [], []
+    for item in items:
+        due_date = item.due_date or now
+        todo_rows.append({
+            "title": item.title,
+            "description": item.description,
+            "priority": item.priority,
+            "due_date": due_date,
+        })
+        event_rows.append({
+            "title": f"TODO: {item.title}",
+            "description": f"{item.description or ''}\n\nPriority: {item.priority.value}\nFrom: LGCH Todo System",
+            "event_from": due_date,
+            "event_to": due_date + timedelta(hours=1),
+        })
+
+    # Each table gets one multi-row INSERT ... RETURNING (batched by insertmanyvalues)
+    async with SessionLocal() as session, session.begin():
+        todos = (await session.scalars(_INSERT_TODOS, todo_rows)).all()
+        event_ids = (await session.scalars(_INSERT_CALENDAR_EVENT_IDS, event_rows)).all()
+
+    # One job creates all Google Calendar events with batch requests
+    google_event_ids = await create_google_events(
+        events=[
+            {
+                "title": event["title"],
+                "description": event["description"],
+                "start_time": event["event_from"],
+                "end_time": event["event_to"],
+                "rows": [(DBTodo, todo.id), (DBCalendarEvent, event_id)],
+            }
+            for event, todo, event_id in zip(event_rows, todos, event_ids)
+        ],
+    )
+    for todo, google_event_id in zip(todos, google_event_ids):
+        todo.google_calendar_event_id = google_event_id
+
+    return _rows_json(_TODO_LIST, Todo, todos)
 
 @mcp.tool()
-async def get_todos() -> str:
-    """Get all todo items.
+async def get_todos(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[UUID] = None) -> str:
+    """Get todo items, newest first, one page at a time.
     
+    Args:
+        limit: The maximum number of todo items to return (at most 500).
+        cursor: The next_cursor from the previous page. Leave empty for the first page.
+
     Returns:
-        A list of all todo items.
+        An object with the page of todo items under "items" and a "next_cursor" to pass for the next page
+        (null when there are no more).
     """
-    with SessionLocal() as session:
-        todos = session.query(DBTodo).all()
-        todos_list = [Todo.model_validate(todo.__dict__).model_dump_json(indent=2) for todo in todos]
-    return f"[{', \n'.join(todos_list)}]"
+    return await _fetch_page(_TODOS_PAGE, limit, cursor)
 
 @mcp.tool()
 async def complete_todo(id: UUID) -> str:
@@ -252,29 +573,20 @@ async def complete_todo(id: UUID) -> str:
     Returns:
         The updated todo item.
     """
-    with SessionLocal() as session:
-        todo = session.query(DBTodo).filter(DBTodo.id == id).first()
-        if not todo:
-            return "Todo not found"
-        
-        todo.completed = True
-        session.commit()
-        
-        # Update Google Calendar event
-        if todo.google_calendar_event_id:
-            try:
-                calendar_service = get_calendar_service()
-                calendar_service.update_event(
-                    event_id=todo.google_calendar_event_id,
-                    title=f"COMPLETED: {todo.title}",
-                    description=f"{todo.description or ''}\n\nPriority: {todo.priority}\nStatus: Completed\nFrom: LGCH Todo System"
-                )
-            except Exception as e:
-                print(f"Failed to update Google Calendar event: {e}")
-        
-        session.refresh(todo)
+    # One UPDATE ... RETURNING marks it completed and reads the row back
+    todo = await _update_returning(DBTodo, DBTodo.id == id, {"completed": True})
+    if not todo:
+        return "Todo not found"
     
-    return Todo.model_validate(todo.__dict__).model_dump_json(indent=2)
+    # Update Google Calendar event
+    if todo.google_calendar_event_id:
+        await update_google_event(
+            event_id=todo.google_calendar_event_id,
+            title=f"COMPLETED: {todo.title}",
+            description=f"{todo.description or ''}\n\nPriority: {todo.priority}\nStatus: Completed\nFrom: LGCH Todo System"
+        )
+    
+    return _row_json(Todo, todo)
 
 @mcp.tool()
 async def update_todo(
@@ -298,26 +610,23 @@ async def update_todo(
     Returns:
         The updated todo item.
     """
-    with SessionLocal() as session:
-        todo = session.query(DBTodo).filter(DBTodo.id == id).first()
-        if not todo:
-            return "Todo not found"
-        
-        if title:
-            todo.title = title
-        if description is not None:
-            todo.description = description
-        if priority:
-            todo.priority = priority.value
-        if due_date is not None:
-            todo.due_date = due_date
-        if completed is not None:
-            todo.completed = completed
-
-        session.commit()
-        session.refresh(todo)
-    
-    return Todo.model_validate(todo.__dict__).model_dump_json(indent=2)
+    values = {}
+    if title:
+        values["title"] = title
+    if description is not None:
+        values["description"] = description
+    if priority:
+        values["priority"] = priority
+    if due_date is not None:
+        values["due_date"] = due_date
+    if completed is not None:
+        values["completed"] = completed
+
+    todo = await _update_returning(DBTodo, DBTodo.id == id, values)
+    if not todo:
+        return "Todo not found"
+    
+    return _row_json(Todo, todo)
 
 @mcp.tool()
 async def delete_todo(id: UUID) -> str:
@@ -329,23 +638,19 @@ async def delete_todo(id: UUID) -> str:
     Returns:
         The deleted todo item.
     """
-    with SessionLocal() as session:
-        todo = session.query(DBTodo).filter(DBTodo.id == id).first()
+    async with SessionLocal() as session:
+        todo = await session.get(DBTodo, id)
         if not todo:
             return "Todo not found"
         
-        # Delete from Google Calendar first
-        if todo.google_calendar_event_id:
-            try:
-                calendar_service = get_calendar_service()
-                calendar_service.delete_event(todo.google_calendar_event_id)
-            except Exception as e:
-                print(f"Failed to delete Google Calendar event: {e}")
-        
-        session.delete(todo)
-        session.commit()
+        await session.delete(todo)
+        await session.commit()
+    
+    # Delete from Google Calendar only once the row is gone
+    if todo.google_calendar_event_id:
+        await delete_google_event(todo.google_calendar_event_id)
     
-    return Todo.model_validate(todo.__dict__).model_dump_json(indent=2)
+    return _row_json(Todo, todo)
 
 @mcp.tool()
 async def create_reminder(
@@ -363,66 +668,104 @@ async def create_reminder(
     Returns:
         The created reminder.
     """
-    with SessionLocal() as session:
-        # Handle both string and enum inputs for importance
-        importance_value = importance.value if hasattr(importance, 'value') else importance
-        
+    # Set default times for calendar event
+    start_time = reminder_date if reminder_date else datetime.now(timezone.utc)
+    end_time = start_time + timedelta(minutes=30)  # Reminders are typically shorter events
+    event_title = f"REMINDER: {reminder_text}"
+    event_description = f"Importance: {importance.value}\nFrom: LGCH Todo System"
+
+    # Reminder and its calendar event are written in a single transaction
+    async with SessionLocal() as session, session.begin():
         new_reminder = DBReminder(
             reminder_text=reminder_text,
-            importance=importance_value,
+            importance=importance,
             reminder_date=reminder_date,
             )
-        session.add(new_reminder)
-        session.commit()
-        session.refresh(new_reminder)
-        
-        # Create corresponding calendar event
-        try:
-            # Set default times for calendar event
-            start_time = reminder_date if reminder_date else datetime.now(timezone.utc)
-            end_time = start_time + timedelta(minutes=30)  # Reminders are typically shorter events
-            
-            # Create local calendar event
-            new_event = DBCalendarEvent(
-                title=f"REMINDER: {reminder_text}",
-                description=f"Importance: {importance_value}\nFrom: LGCH Todo System",
-                event_from=start_time,
-                event_to=end_time,
-            )
-            session.add(new_event)
-            session.commit()
-            session.refresh(new_event)
-            
-            # Sync with Google Calendar
-            calendar_service = get_calendar_service()
-            google_event_id = calendar_service.create_event(
-                title=f"REMINDER: {reminder_text}",
-                description=f"Importance: {importance_value}\nFrom: LGCH Todo System",
-                start_time=start_time,
-                end_time=end_time
-            )
-            if google_event_id:
-                new_event.google_calendar_event_id = google_event_id
-                new_reminder.google_calendar_event_id = google_event_id
-                session.commit()
-                session.refresh(new_reminder)
-                session.refresh(new_event)
-        except Exception as e:
-            print(f"Failed to create calendar event or sync reminder with Google Calendar: {e}")
+        # Create corresponding local calendar event
+        new_event = DBCalendarEvent(
+            title=event_title,
+            description=event_description,
+            event_from=start_time,
+            event_to=end_time,
+        )
+        session.add_all([new_reminder, new_event])
+        # One flush inserts both rows; server defaults (id, timestamps) come back via RETURNING
+        await session.flush()
     
-    return Reminder.model_validate(new_reminder.__dict__).model_dump_json(indent=2)
+    # Sync with Google Calendar; the event id is stored on both rows
+    google_event_id = await create_google_event(
+        title=event_title,
+        description=event_description,
+        start_time=start_time,
+        end_time=end_time,
+        rows=[(DBReminder, new_reminder.id), (DBCalendarEvent, new_event.id)],
+    )
+    new_reminder.google_calendar_event_id = google_event_id
+    
+    return _row_json(Reminder, new_reminder)
 
 @mcp.tool()
-async def get_reminders() -> str:
-    """Get all reminders.
+async def bulk_create_reminders(items: List[ReminderCreate]) -> str:
+    """Create several reminders at once.
     
+    Args:
+        items: The reminders to create, each with reminder_text and optional importance and reminder_date.
+
     Returns:
-        A list of all reminders.
+        The created reminders.
     """
-    with SessionLocal() as session:
-        reminders = session.query(DBReminder).all()
-        reminders_list = [Reminder.model_validate(reminder.__dict__).model_dump_json(indent=2) for reminder in reminders]
-    return f"[{', \n'.join(reminders_list)}]"
+    now = datetime.now(timezone.utc)
+    reminder_rows, event_rows = [], []
+    for item in items:
+        start_time = item.reminder_date or now
+        reminder_rows.append({
+            "reminder_text": item.reminder_text,
+            "importance": item.importance,
+            "reminder_date": item.reminder_date,
+        })
+        event_rows.append({
+            "title": f"REMINDER: {item.reminder_text}",
+            "description": f"Importance: {item.importance.value}\nFrom: LGCH Todo System",
+            "event_from": start_time,
+            "event_to": start_time + timedelta(minutes=30),
+        })
+
+    # Each table gets one multi-row INSERT ... RETURNING (batched by insertmanyvalues)
+    async with SessionLocal() as session, session.begin():
+        reminders = (await session.scalars(_INSERT_REMINDERS, reminder_rows)).all()
+        event_ids = (await session.scalars(_INSERT_CALENDAR_EVENT_IDS, event_rows)).all()
+
+    # One job creates all Google Calendar events with batch requests
+    google_event_ids = await create_google_events(
+        events=[
+            {
+                "title": event["title"],
+                "description": event["description"],
+                "start_time": event["event_from"],
+                "end_time": event["event_to"],
+                "rows": [(DBReminder, reminder.id), (DBCalendarEvent, event_id)],
+            }
+            for event, reminder, event_id in zip(event_rows, reminders, event_ids)
+        ],
+    )
+    for reminder, google_event_id in zip(reminders, google_event_ids):
+        reminder.google_calendar_event_id = google_event_id
+
+    return _rows_json(_REMINDER_LIST, Reminder, reminders)
+
+@mcp.tool()
+async def get_reminders(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[UUID] = None) -> str:
+    """Get reminders, newest first, one page at a time.
+    
+    Args:
+        limit: The maximum number of reminders to return (at most 500).
+        cursor: The next_cursor from the previous page. Leave empty for the first page.
+
+    Returns:
+        An object with the page of reminders under "items" and a "next_cursor" to pass for the next page
+        (null when there are no more).
+    """
+    return await _fetch_page(_REMINDERS_PAGE, limit, cursor)
 
 @mcp.tool()
 async def delete_reminder(id: UUID) -> str:
@@ -434,23 +777,19 @@ async def delete_reminder(id: UUID) -> str:
     Returns:
         The deleted reminder.
     """
-    with SessionLocal() as session:
-        reminder = session.query(DBReminder).filter(DBReminder.id == id).first()
+    async with SessionLocal() as session:
+        reminder = await session.get(DBReminder, id)
         if not reminder:
             return "Reminder not found"
         
-        # Delete from Google Calendar first
-        if reminder.google_calendar_event_id:
-            try:
-                calendar_service = get_calendar_service()
-                calendar_service.delete_event(reminder.google_calendar_event_id)
-            except Exception as e:
-                print(f"Failed to delete Google Calendar event: {e}")
-        
-        session.delete(reminder)
-        session.commit()
+        await session.delete(reminder)
+        await session.commit()
     
-    return Reminder.model_validate(reminder.__dict__).model_dump_json(indent=2)
+    # Delete from Google Calendar only once the row is gone
+    if reminder.google_calendar_event_id:
+        await delete_google_event(reminder.google_calendar_event_id)
+    
+    return _row_json(Reminder, reminder)
 
 @mcp.tool()
 async def create_calendar_event(
@@ -470,7 +809,7 @@ async def create_calendar_event(
     Returns:
         The created calendar event.
     """
-    with SessionLocal() as session:
+    async with SessionLocal() as session, session.begin():
         new_event = DBCalendarEvent(
             title=title,
             description=description,
@@ -478,44 +817,33 @@ async def create_calendar_event(
             event_to=event_to,
             )
         session.add(new_event)
-        session.commit()
-        session.refresh(new_event)
-        
-        # Sync with Google Calendar
-        try:
-            print(f"🔄 Attempting to sync calendar event: {title}")
-            calendar_service = get_calendar_service()
-            google_event_id = calendar_service.create_event(
-                title=title,
-                description=f"{description or ''}\n\nFrom: LGCH Todo System",
-                start_time=event_from,
-                end_time=event_to
-            )
-            if google_event_id:
-                new_event.google_calendar_event_id = google_event_id
-                session.commit()
-                session.refresh(new_event)
-                print(f"✅ Successfully created Google Calendar event: {google_event_id}")
-            else:
-                print("❌ Google Calendar event creation returned None")
-        except Exception as e:
-            print(f"❌ Failed to sync calendar event with Google Calendar: {e}")
-            import traceback
-            traceback.print_exc()
+        # Server defaults come back via RETURNING on flush; the commit happens once on block exit
+        await session.flush()
     
-    return CalendarEvent.model_validate(new_event.__dict__).model_dump_json(indent=2)
+    # Sync with Google Calendar; the event id is stored on the row
+    new_event.google_calendar_event_id = await create_google_event(
+        title=title,
+        description=f"{description or ''}\n\nFrom: LGCH Todo System",
+        start_time=event_from,
+        end_time=event_to,
+        rows=[(DBCalendarEvent, new_event.id)],
+    )
+    
+    return _row_json(CalendarEvent, new_event)
 
 @mcp.tool()
-async def get_calendar_events() -> str:
-    """Get all calendar events.
+async def get_calendar_events(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[UUID] = None) -> str:
+    """Get calendar events, newest first, one page at a time.
     
+    Args:
+        limit: The maximum number of calendar events to return (at most 500).
+        cursor: The next_cursor from the previous page. Leave empty for the first page.
+
     Returns:
-        A list of all calendar events.
+        An object with the page of calendar events under "items" and a "next_cursor" to pass for the next page
+        (null when there are no more).
     """
-    with SessionLocal() as session:
-        events = session.query(DBCalendarEvent).all()
-        events_list = [CalendarEvent.model_validate(event.__dict__).model_dump_json(indent=2) for event in events]
-    return f"[{', \n'.join(events_list)}]"
+    return await _fetch_page(_CALENDAR_EVENTS_PAGE, limit, cursor)
 
 @mcp.tool()
 async def delete_calendar_event(id: UUID) -> str:
@@ -527,23 +855,19 @@ async def delete_calendar_event(id: UUID) -> str:
     Returns:
         The deleted calendar event.
     """
-    with SessionLocal() as session:
-        event = session.query(DBCalendarEvent).filter(DBCalendarEvent.id == id).first()
+    async with SessionLocal() as session:
+        event = await session.get(DBCalendarEvent, id)
         if not event:
             return "Calendar event not found"
         
-        # Delete from Google Calendar first
-        if event.google_calendar_event_id:
-            try:
-                calendar_service = get_calendar_service()
-                calendar_service.delete_event(event.google_calendar_event_id)
-            except Exception as e:
-                print(f"Failed to delete Google Calendar event: {e}")
-        
-        session.delete(event)
-        session.commit()
+        await session.delete(event)
+        await session.commit()
+    
+    # Delete from Google Calendar only once the row is gone
+    if event.google_calendar_event_id:
+        await delete_google_event(event.google_calendar_event_id)
     
-    return CalendarEvent.model_validate(event.__dict__).model_dump_json(indent=2)
+    return _row_json(CalendarEvent, event)
 
 @mcp.tool()
 async def create_call_recording(
@@ -571,7 +895,7 @@ async def create_call_recording(
     Returns:
         The created call recording record
     """
-    with SessionLocal() as session:
+    async with SessionLocal() as session, session.begin():
         recording = DBCallRecording(
             call_sid=call_sid,
             recording_path=recording_path,
@@ -583,22 +907,24 @@ async def create_call_recording(
             status=status
         )
         session.add(recording)
-        session.commit()
-        session.refresh(recording)
+        # Server defaults come back via RETURNING on flush; the commit happens once on block exit
+        await session.flush()
     
-    return CallRecording.model_validate(recording.__dict__).model_dump_json(indent=2)
+    return _row_json(CallRecording, recording)
 
 @mcp.tool()
-async def get_call_recordings() -> str:
-    """Get all call recordings.
+async def get_call_recordings(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[UUID] = None) -> str:
+    """Get call recordings, newest first, one page at a time.
     
+    Args:
+        limit: The maximum number of call recordings to return (at most 500).
+        cursor: The next_cursor from the previous page. Leave empty for the first page.
+
     Returns:
-        A list of all call recordings
+        An object with the page of call recordings under "items" and a "next_cursor" to pass for the next page
+        (null when there are no more).
     """
-    with SessionLocal() as session:
-        recordings = session.query(DBCallRecording).order_by(DBCallRecording.created_at.desc()).all()
-    
-    return [CallRecording.model_validate(recording.__dict__).model_dump() for recording in recordings]
+    return await _fetch_page(_CALL_RECORDINGS_PAGE, limit, cursor)
 
 @mcp.tool()
 async def get_call_recording_by_sid(call_sid: str) -> str:
@@ -610,13 +936,13 @@ async def get_call_recording_by_sid(call_sid: str) -> str:
     Returns:
         The call recording record or error message
     """
-    with SessionLocal() as session:
-        recording = session.query(DBCallRecording).filter(DBCallRecording.call_sid == call_sid).first()
+    async with SessionLocal() as session:
+        recording = await session.scalar(_RECORDING_BY_SID, {"call_sid": call_sid})
         
         if not recording:
             return f"Call recording with SID {call_sid} not found"
     
-    return CallRecording.model_validate(recording.__dict__).model_dump_json(indent=2)
+    return _row_json(CallRecording, recording)
 
 @mcp.tool()
 async def update_call_recording(
@@ -638,25 +964,27 @@ async def update_call_recording(
     Returns:
         The updated call recording record
     """
-    with SessionLocal() as session:
-        recording = session.query(DBCallRecording).filter(DBCallRecording.call_sid == call_sid).first()
-        
-        if not recording:
-            return f"Call recording with SID {call_sid} not found"
-        
-        if transcription is not None:
-            recording.transcription = transcription
-        if status is not None:
-            recording.status = status
-        if duration_seconds is not None:
-            recording.duration_seconds = duration_seconds
-        if file_size_bytes is not None:
-            recording.file_size_bytes = file_size_bytes
-            
-        session.commit()
-        session.refresh(recording)
-    
-    return CallRecording.model_validate(recording.__dict__).model_dump_json(indent=2)
+    values = {}
+    if transcription is not None:
+        values["transcription"] = transcription
+    if status is not None:
+        values["status"] = status
+    if duration_seconds is not None:
+        values["duration_seconds"] = duration_seconds
+    if file_size_bytes is not None:
+        values["file_size_bytes"] = file_size_bytes
+
+    recording = await _update_returning(DBCallRecording, DBCallRecording.call_sid == call_sid, values)
+    if not recording:
+        return f"Call recording with SID {call_sid} not found"
+    
+    return _row_json(CallRecording, recording)
+
+def _remove_if_exists(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
 
 @mcp.tool()
 async def delete_call_recording(call_sid: str) -> str:
@@ -668,24 +996,43 @@ async def delete_call_recording(call_sid: str) -> str:
     Returns:
         Success message or error
     """
-    with SessionLocal() as session:
-        recording = session.query(DBCallRecording).filter(DBCallRecording.call_sid == call_sid).first()
+    async with SessionLocal() as session:
+        recording = await session.scalar(_RECORDING_BY_SID, {"call_sid": call_sid})
         
         if not recording:
             return f"Call recording with SID {call_sid} not found"
         
-        # Delete the actual file if it exists
+        # Delete the actual file if it exists, off the event loop
         try:
-            if os.path.exists(recording.recording_path):
-                os.remove(recording.recording_path)
+            await asyncio.to_thread(_remove_if_exists, recording.recording_path)
         except Exception as e:
             return f"Error deleting file: {str(e)}"
         
-        session.delete(recording)
-        session.commit()
+        await session.delete(recording)
+        await session.commit()
     
     return f"Call recording {call_sid} deleted successfully"
 
+# Rows fetched per round trip by query_db
+QUERY_DB_PARTITION_SIZE = int(os.getenv("QUERY_DB_PARTITION_SIZE", 1000))
+
+# A server-side cursor (DECLARE ... CURSOR) only accepts SELECT and VALUES, so anything else
+# (SHOW, EXPLAIN, DML with RETURNING, ...) runs as a regular query
+_CURSOR_QUERY = re.compile(r"^(?:\s+|--[^\n]*\n?|/\*.*?\*/)*(?:select|values)\b", re.IGNORECASE | re.DOTALL)
+
+
+def _json_default(value):
+    """Encode column types orjson doesn't handle natively (numeric -> float, anything else -> str)."""
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _json_rows(rows) -> bytes:
+    """Encode mapping rows as the comma-separated body of a JSON array (without the brackets)."""
+    return orjson.dumps([dict(row) for row in rows], default=_json_default)[1:-1]
+
+
 @mcp.tool()
 async def query_db(query: str) -> str:
     """Query the database using SQL.
@@ -696,11 +1043,36 @@ async def query_db(query: str) -> str:
     Returns:
         The query results
     """
-    with SessionLocal() as session:
-        result = session.execute(text(query))
+    # Rows are encoded to JSON a partition at a time, so only the encoded bytes accumulate (not row
+    # objects); a plain SELECT is also fetched from a server-side cursor in partition-sized batches
+    chunks = []
+    async with SessionLocal() as session:
+        if _CURSOR_QUERY.match(query):
+            result = await session.stream(text(query))
+            async for partition in result.mappings().partitions(QUERY_DB_PARTITION_SIZE):
+                chunks.append(_json_rows(partition))
+        else:
+            result = await session.execute(text(query))
+            if result.returns_rows:
+                for partition in result.mappings().partitions(QUERY_DB_PARTITION_SIZE):
+                    chunks.append(_json_rows(partition))
         
-    return pd.DataFrame(result.all(), columns=result.keys()).to_json(orient="records", indent=2)
+    return (b"[" + b",".join(chunks) + b"]").decode()
+
+
+def _configure_logging() -> None:
+    """Hand log records to a queue that a listener thread writes to stderr.
+
+    Logging then never blocks the event loop, and stdout stays reserved for the stdio MCP transport.
+    Only done when running as the MCP server; importers of this module keep their own logging setup.
+    """
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
+    listener.start()
+    atexit.register(listener.stop)
 
 
 if __name__ == "__main__":
+    _configure_logging()
     mcp.run(transport="stdio") 
\ No newline at end of file
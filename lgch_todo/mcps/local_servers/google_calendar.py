@@ -3,17 +3,26 @@ import json
 import base64
 import tempfile
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import pickle
+import logging
+import threading
+import google_auth_httplib2
+from googleapiclient.http import build_http
 
 # If modifying these scopes, delete the file token.pickle.
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
+logger = logging.getLogger(__name__)
+
+# Google recommends at most 50 calls per batch request
+BATCH_SIZE = 50
+
 class GoogleCalendarService:
     def __init__(self, credentials_file: str = 'credentials.json', token_file: str = 'token.pickle'):
         """
@@ -26,6 +35,9 @@ class GoogleCalendarService:
         self.credentials_file = credentials_file
         self.token_file = token_file
         self.service = None
+        self.creds = None
+        # httplib2.Http isn't thread-safe, so each thread gets its own authorized connection
+        self._local = threading.local()
         self._authenticate()
     
     def _authenticate(self):
@@ -39,7 +51,7 @@ class GoogleCalendarService:
                 token_data = base64.b64decode(token_b64)
                 creds = pickle.loads(token_data)
             except Exception as e:
-                print(f"Warning: Could not load token from environment variable: {e}")
+                logger.warning("Could not load token from environment variable: %s", e)
                 creds = None
         elif os.path.exists(self.token_file):
             with open(self.token_file, 'rb') as token:
@@ -88,15 +100,41 @@ class GoogleCalendarService:
                 token_b64 = base64.b64encode(token_data).decode('utf-8')
                 # Note: In production, you'd want to update the .env file or use a proper config management system
                 # For now, we'll just save to file as backup
-                print(f"Token updated. To persist in .env, add: GOOGLE_TOKEN_B64={token_b64}")
+                logger.info("Token updated. To persist in .env, add: GOOGLE_TOKEN_B64=%s", token_b64)
             except Exception as e:
-                print(f"Warning: Could not encode token for environment variable: {e}")
+                logger.warning("Could not encode token for environment variable: %s", e)
             
             # Also save to file as backup
             with open(self.token_file, 'wb') as token:
                 pickle.dump(creds, token)
         
-        self.service = build('calendar', 'v3', credentials=creds)
+        self.creds = creds
+        # Built once and shared; the discovery document is bundled so this doesn't hit the network
+        self.service = build('calendar', 'v3', credentials=creds, cache_discovery=False)
+    
+    def _http(self) -> google_auth_httplib2.AuthorizedHttp:
+        """Return this thread's authorized HTTP connection, refreshing the token when it expires."""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(self.creds, http=build_http())
+            self._local.http = http
+        return http
+    
+    def _event_body(self, title: str, description: Optional[str], start_time: datetime,
+                    end_time: datetime, timezone: str = 'UTC') -> Dict[str, Any]:
+        """Build the request body for a new event."""
+        return {
+            'summary': title,
+            'description': description or '',
+            'start': {
+                'dateTime': start_time.isoformat(),
+                'timeZone': timezone,
+            },
+            'end': {
+                'dateTime': end_time.isoformat(),
+                'timeZone': timezone,
+            },
+        }
     
     def create_event(self, title: str, description: str = None, 
                     start_time: datetime = None, end_time: datetime = None,
@@ -120,29 +158,50 @@ class GoogleCalendarService:
             if not end_time:
                 end_time = start_time + timedelta(hours=1)
             
-            event = {
-                'summary': title,
-                'description': description or '',
-                'start': {
-                    'dateTime': start_time.isoformat(),
-                    'timeZone': timezone,
-                },
-                'end': {
-                    'dateTime': end_time.isoformat(),
-                    'timeZone': timezone,
-                },
-            }
+            event = self._event_body(title, description, start_time, end_time, timezone)
             
             event = self.service.events().insert(
                 calendarId='primary', body=event
-            ).execute()
+            ).execute(http=self._http())
             
             return event.get('id')
         
         except HttpError as error:
-            print(f'An error occurred: {error}')
+            logger.error('An error occurred: %s', error)
             return None
     
+    def create_events(self, events: List[Dict[str, Any]], timezone: str = 'UTC') -> List[Optional[str]]:
+        """
+        Create several Google Calendar events using batch HTTP requests.
+        
+        Args:
+            events: Dicts with title, description, start_time and end_time
+            timezone: Timezone string
+            
+        Returns:
+            Google Calendar event IDs in the same order as events, None for any that failed
+        """
+        event_ids: List[Optional[str]] = [None] * len(events)
+        
+        def on_response(request_id, response, exception):
+            if exception is not None:
+                logger.error('An error occurred: %s', exception)
+            else:
+                event_ids[int(request_id)] = response.get('id')
+        
+        for offset in range(0, len(events), BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=on_response)
+            for i, event in enumerate(events[offset:offset + BATCH_SIZE], start=offset):
+                body = self._event_body(event['title'], event.get('description'),
+                                        event['start_time'], event['end_time'], timezone)
+                batch.add(self.service.events().insert(calendarId='primary', body=body), request_id=str(i))
+            try:
+                batch.execute(http=self._http())
+            except HttpError as error:
+                logger.error('An error occurred: %s', error)
+        
+        return event_ids
+    
     def update_event(self, event_id: str, title: str = None, 
                     description: str = None, start_time: datetime = None,
                     end_time: datetime = None, timezone: str = 'UTC') -> bool:
@@ -164,7 +223,7 @@ class GoogleCalendarService:
             # Get existing event
             event = self.service.events().get(
                 calendarId='primary', eventId=event_id
-            ).execute()
+            ).execute(http=self._http())
             
             # Update fields
             if title:
@@ -178,12 +237,12 @@ class GoogleCalendarService:
             
             self.service.events().update(
                 calendarId='primary', eventId=event_id, body=event
-            ).execute()
+            ).execute(http=self._http())
             
             return True
         
         except HttpError as error:
-            print(f'An error occurred: {error}')
+            logger.error('An error occurred: %s', error)
             return False
     
     def delete_event(self, event_id: str) -> bool:
@@ -199,11 +258,11 @@ class GoogleCalendarService:
         try:
             self.service.events().delete(
                 calendarId='primary', eventId=event_id
-            ).execute()
+            ).execute(http=self._http())
             return True
         
         except HttpError as error:
-            print(f'An error occurred: {error}')
+            logger.error('An error occurred: %s', error)
             return False
     
     def get_event(self, event_id: str) -> Optional[Dict[str, Any]]:
@@ -219,22 +278,26 @@ class GoogleCalendarService:
         try:
             event = self.service.events().get(
                 calendarId='primary', eventId=event_id
-            ).execute()
+            ).execute(http=self._http())
             return event
         
         except HttpError as error:
-            print(f'An error occurred: {error}')
+            logger.error('An error occurred: %s', error)
             return None
 
 # Global instance for easy access
 _calendar_service = None
+_calendar_service_lock = threading.Lock()
 
 def get_calendar_service() -> GoogleCalendarService:
     """Get or create the global Google Calendar service instance."""
     global _calendar_service
     if _calendar_service is None:
-        _calendar_service = GoogleCalendarService()
-    return _calendar_service 
+        # Sync workers call this from several threads; authenticate only once
+        with _calendar_service_lock:
+            if _calendar_service is None:
+                _calendar_service = GoogleCalendarService()
+    return _calendar_service
 
 if __name__ == "__main__":
     # To generate token.pickle from credentials.json in the project root,
@@ -0,0 +1,35 @@
+-- Migrate todos_lgch.priority and reminders_lgch.importance from text columns with CHECK constraints
+-- to the todo_priority/reminder_importance enum types the models expect.
+-- Idempotent: safe to run more than once, and a no-op on a database created from generate_tables.sql.
+-- Run it before deploying the code that uses the enum types.
+
+do $$
+begin
+  if not exists (select 1 from pg_type where typname = 'todo_priority' and typnamespace = 'public'::regnamespace) then
+    create type public.todo_priority as enum ('low', 'medium', 'high', 'urgent');
+  end if;
+  if not exists (select 1 from pg_type where typname = 'reminder_importance' and typnamespace = 'public'::regnamespace) then
+    create type public.reminder_importance as enum ('low', 'medium', 'high', 'urgent');
+  end if;
+
+  if exists (
+    select 1 from information_schema.columns
+    where table_schema = 'public' and table_name = 'todos_lgch' and column_name = 'priority' and data_type = 'text'
+  ) then
+    alter table public.todos_lgch drop constraint if exists todos_lgch_priority_check,
+      alter column priority drop default,
+      alter column priority type public.todo_priority using priority::public.todo_priority,
+      alter column priority set default 'medium';
+  end if;
+
+  if exists (
+    select 1 from information_schema.columns
+    where table_schema = 'public' and table_name = 'reminders_lgch' and column_name = 'importance' and data_type = 'text'
+  ) then
+    alter table public.reminders_lgch drop constraint if exists reminders_lgch_importance_check,
+      alter column importance drop default,
+      alter column importance type public.reminder_importance using importance::public.reminder_importance,
+      alter column importance set default 'medium';
+  end if;
+end
+$$;
@@ -1,16 +1,24 @@
 from flask import Blueprint, request, jsonify, render_template, Response
-from langchain_core.messages import HumanMessage
-from langgraph.graph import StateGraph
 import asyncio
-import json
 import os
+import re
+import threading
+import time
 import requests
+from cachetools import TTLCache
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from uuid import uuid4
+from typing import Optional
+from xml.sax.saxutils import escape as xml_escape
 
-from twilio.twiml.voice_response import VoiceResponse, Connect, Gather
-from .state import AgentState
-from .assistant_graph_todo import TodoAgent
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from twilio.twiml.voice_response import VoiceResponse, Connect
 
+from .agent_registry import get_shared_agent
+
+# LangGraph, LangChain and the MCP client are imported inside the agent helpers (and the registry) so that
+# registering this blueprint doesn't pull them (and the OpenAI client) into every Flask worker.
 
 lgch_todo_bp = Blueprint(
     'lgch_todo',
@@ -20,95 +28,154 @@ lgch_todo_bp = Blueprint(
     static_folder='static'
 )
 
-def get_webhook_base_url():
-    """Get the webhook base URL for Twilio webhooks."""
-    # Check if we're in production or development
-    if os.getenv('FLASK_ENV') == 'production' or os.getenv('ENVIRONMENT') == 'production':
-        # Production: Use environment variable or default domain
-        return os.getenv('WEBHOOK_BASE_URL', 'https://hjlees.com')
-    else:
-        # Development: Try ngrok first, fallback to localhost
-        try:
-            # Get ngrok tunnels from local API
-            response = requests.get("http://localhost:4040/api/tunnels", timeout=5)
-            tunnels = response.json()
-            
-            # Look for a Flask tunnel (HTTP tunnel for port 5000)
-            for tunnel in tunnels.get('tunnels', []):
-                if tunnel.get('config', {}).get('addr') == 'http://localhost:5000':
-                    return tunnel.get('public_url', 'http://localhost:5000')
-            
-            # If no ngrok tunnel found, use localhost (for testing)
-            print("WARNING: No ngrok tunnel found. Using localhost for development.")
-            return "http://localhost:5000"
-        except Exception as e:
-            print(f"Error getting ngrok tunnel info: {e}")
-            return "http://localhost:5000"
-
-def get_websocket_url():
-    """Get the WebSocket URL for Twilio Media Streams."""
-    # Check if we're in production or development
-    if os.getenv('FLASK_ENV') == 'production' or os.getenv('ENVIRONMENT') == 'production':
-        # Production: Use environment variable or default domain
-        base_url = os.getenv('WEBSOCKET_BASE_URL', 'wss://hjlees.com')
-        return base_url
-    else:
-        # Development: Try ngrok first, fallback to localhost
-        try:
-            # Get ngrok tunnels from local API
-            response = requests.get("http://localhost:4040/api/tunnels", timeout=5)
-            tunnels = response.json()
-            
-            # Look for a WebSocket tunnel (HTTP tunnel for port 5001)
-            for tunnel in tunnels.get('tunnels', []):
-                if tunnel.get('config', {}).get('addr') == 'http://localhost:5001':
-                    public_url = tunnel.get('public_url', '')
-                    if public_url.startswith('https://'):
-                        # Convert https:// to wss://
-                        return public_url.replace('https://', 'wss://')
-            
-            # If no ngrok tunnel found, use localhost (for testing)
-            print("WARNING: No ngrok tunnel found. Using localhost for development.")
-            return "ws://localhost:5001"
-        except Exception as e:
-            print(f"Error getting ngrok tunnel info: {e}")
-            return "ws://localhost:5001"
+# ngrok's local API is only consulted in development; its answer is cached for NGROK_CACHE_TTL seconds
+NGROK_API_URL = "http://localhost:4040/api/tunnels"
+NGROK_CACHE_TTL = float(os.getenv('NGROK_CACHE_TTL', 60))
+
+# One keep-alive session for this module's outbound HTTP calls (currently just the ngrok API)
+_http = requests.Session()
+_http_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=Retry(total=2, backoff_factor=0.1))
+_http.mount('http://', _http_adapter)
+_http.mount('https://', _http_adapter)
+
+_ngrok_tunnels: list = []
+_ngrok_expires_at = 0.0
+_ngrok_lock = threading.Lock()
+
+
+def _is_production() -> bool:
+    return os.getenv('FLASK_ENV') == 'production' or os.getenv('ENVIRONMENT') == 'production'
+
+
+def _get_ngrok_tunnels() -> list:
+    """Return ngrok's tunnel list, probing the local API at most once per NGROK_CACHE_TTL."""
+    global _ngrok_tunnels, _ngrok_expires_at
+    if time.monotonic() < _ngrok_expires_at:
+        return _ngrok_tunnels
+
+    with _ngrok_lock:
+        if time.monotonic() >= _ngrok_expires_at:
+            try:
+                response = _http.get(NGROK_API_URL, timeout=5)
+                _ngrok_tunnels = response.json().get('tunnels', [])
+            except Exception as e:
+                # Failures are cached too, so a stopped ngrok costs one timeout per TTL, not one per call
+                print(f"Error getting ngrok tunnel info: {e}")
+                _ngrok_tunnels = []
+            _ngrok_expires_at = time.monotonic() + NGROK_CACHE_TTL
+        return _ngrok_tunnels
+
+
+def _ngrok_public_url(local_addr: str) -> Optional[str]:
+    for tunnel in _get_ngrok_tunnels():
+        if tunnel.get('config', {}).get('addr') == local_addr:
+            return tunnel.get('public_url')
+    return None
+
+
+@lru_cache(maxsize=1)
+def _production_webhook_base_url() -> str:
+    return os.getenv('WEBHOOK_BASE_URL', 'https://hjlees.com')
+
+
+@lgch_todo_bp.record_once
+def _warm_ngrok_tunnels(state):
+    # Probe ngrok when the blueprint is registered so the first Twilio webhook in development doesn't wait on it
+    if not _is_production():
+        _get_ngrok_tunnels()
+
+# Phrases that end a Twilio call, matched as whole words in one pass ("bye" but not "byte")
+_EXIT_PHRASES_RE = re.compile(
+    r"\b(?:exit|goodbye|bye|that['’]?s it|that is it|thank you|thanks|done|finished|end call|hang up)\b",
+    re.IGNORECASE,
+)
 
 # --- Twilio Voice Routes ---
-@lgch_todo_bp.route('/twilio/call', methods=['POST'])
-def twilio_call_webhook():
-    """
-    Handles incoming calls from Twilio.
-    Uses Gather to collect speech input and redirect to processing endpoint.
-    """
-    # Get the current webhook base URL
-    webhook_base_url = get_webhook_base_url()
-    
-    # Check if this is a continuation of the conversation
-    is_continuation = request.args.get('is_continuation', 'false').lower() == 'true'
-    
+_VOICE = 'Polly.Amy'
+_GATHER_PATH = '/lgch_todo/twilio/process_audio'
+_CONTINUE_PATH = '/lgch_todo/twilio/call?is_continuation=true'
+
+# Appended to every URL handed to Twilio: a 3 s connect timeout with up to 5 retries of connections that
+# never got through. The read timeout stays at Twilio's 15 s maximum, and requests that reached us are
+# not retried, since a process_audio request runs the agent (and its tool writes) again.
+_TWILIO_CONN_OVERRIDES = "#ct=3000&rc=5&rp=ct"  # https://www.twilio.com/docs/usage/webhooks/webhooks-connection-overrides
+
+
+def _gather_twiml(say: Optional[str], action_url: str, continue_url: str) -> str:
+    """TwiML that optionally says something, listens for speech with barge-in and re-prompts on silence."""
     response = VoiceResponse()
-    
-    # Use Gather to collect speech input with barge-in capability
     gather = response.gather(
         input='speech',
-        action='/lgch_todo/twilio/process_audio',
+        action=action_url,
         method='POST',
         speech_timeout='auto',
         timeout=10,
         barge_in=True  # Enable barge-in to interrupt while speaking
     )
-    
-    # Only say the welcome message if this is the initial call
-    if not is_continuation:
-        gather.say("Hello! I'm Luna, your personal productivity assistant. How can I help you today?", voice='Polly.Amy')
-    
+    if say is not None:
+        gather.say(say, voice=_VOICE)
+
     # Fallback if no speech is detected
-    response.say("I didn't hear anything. Please try again.", voice='Polly.Amy')
-    response.redirect('/lgch_todo/twilio/call?is_continuation=true')
-    
-    print(f"Generated TwiML for incoming call: {str(response)}")
-    return Response(str(response), mimetype='text/xml')
+    response.say("I didn't hear anything. Please try again.", voice=_VOICE)
+    response.redirect(continue_url)
+    return str(response)
+
+
+def _goodbye_twiml() -> str:
+    response = VoiceResponse()
+    response.say("Thank you for using Luna! Have a great day!", voice=_VOICE)
+    response.hangup()
+    return str(response)
+
+
+def _twiml_base_url() -> str:
+    """Public base URL for the URLs in our TwiML, or "" to make them relative.
+
+    Twilio resolves relative URLs against the webhook it just called, so they always work; they are
+    used whenever no public URL is known rather than handing Twilio an unreachable localhost URL.
+    """
+    if _is_production():
+        return _production_webhook_base_url()
+    return _ngrok_public_url('http://localhost:5000') or ''
+
+
+@lru_cache(maxsize=4)
+def _twiml_documents(webhook_base_url: str) -> dict[str, str]:
+    """Render the webhook TwiML once per base URL.
+
+    The TwiML shell never changes, so per-request replies only escape and interpolate the agent's
+    text into the "gather" template.
+    """
+    action_url = f"{webhook_base_url}{_GATHER_PATH}{_TWILIO_CONN_OVERRIDES}"
+    continue_url = f"{webhook_base_url}{_CONTINUE_PATH}{_TWILIO_CONN_OVERRIDES}"
+    return {
+        "gather": _gather_twiml("{say}", action_url, continue_url),
+        "welcome": _gather_twiml("Hello! I'm Luna, your personal productivity assistant. How can I help you today?", action_url, continue_url),
+        "continue": _gather_twiml(None, action_url, continue_url),
+        "not_caught": _gather_twiml("I didn't catch that. Could you please repeat?", action_url, continue_url),
+        "error": _gather_twiml("I'm sorry, I encountered an error processing your request. Please try again.", action_url, continue_url),
+        "goodbye": _goodbye_twiml(),
+    }
+
+
+def _twiml_response(twiml: str) -> Response:
+    return Response(twiml, mimetype='text/xml')
+
+
+@lgch_todo_bp.route('/twilio/call', methods=['POST'])
+def twilio_call_webhook():
+    """
+    Handles incoming calls from Twilio.
+    Uses Gather to collect speech input and redirect to processing endpoint.
+    """
+    # Check if this is a continuation of the conversation
+    is_continuation = request.args.get('is_continuation', 'false').lower() == 'true'
+
+    # Only say the welcome message if this is the initial call
+    twiml = _twiml_documents(_twiml_base_url())["continue" if is_continuation else "welcome"]
+
+    print(f"Generated TwiML for incoming call: {twiml}")
+    return _twiml_response(twiml)
 
 @lgch_todo_bp.route('/twilio/process_audio', methods=['POST'])
 def process_audio_webhook():
@@ -129,81 +196,28 @@ def process_audio_webhook():
         print(f"Processing audio for call {call_sid}: {transcribed_text}")
         
         if not transcribed_text or len(transcribed_text.strip()) < 2:
-            response = VoiceResponse()
-            
-            # Use Gather with barge-in for "didn't catch that" response
-            gather = Gather(
-                input='speech',
-                action='/lgch_todo/twilio/process_audio',
-                method='POST',
-                speech_timeout='auto',
-                timeout=10,
-                barge_in=True
-            )
-            gather.say("I didn't catch that. Could you please repeat?", voice='Polly.Amy')
-            response.append(gather)
-            
-            # Fallback
-            response.say("I didn't hear anything. Please try again.", voice='Polly.Amy')
-            response.redirect('/lgch_todo/twilio/call?is_continuation=true')
-            return Response(str(response), mimetype='text/xml')
+            return _twiml_response(_twiml_documents(_twiml_base_url())["not_caught"])
         
         # Check if user wants to end the call
-        exit_phrases = ['exit', 'goodbye', 'bye', 'that\'s it', 'that is it', 'thank you', 'thanks', 'done', 'finished', 'end call', 'hang up']
-        if any(phrase in transcribed_text.lower() for phrase in exit_phrases):
+        if _EXIT_PHRASES_RE.search(transcribed_text):
             # End the call gracefully
-            response = VoiceResponse()
-            response.say("Thank you for using Luna! Have a great day!", voice='Polly.Amy')
-            response.hangup()
-            return Response(str(response), mimetype='text/xml')
+            return _twiml_response(_twiml_documents(_twiml_base_url())["goodbye"])
         
         # Process with the agent
-        agent_response = asyncio.run(_run_agent_async(transcribed_text))
-        
-        # Return TwiML with the agent's response and barge-in capability
-        response = VoiceResponse()
-        
-        # Use Gather with speech input to enable barge-in functionality
-        gather = Gather(
-            input='speech',
-            action='/lgch_todo/twilio/process_audio',
-            method='POST',
-            speech_timeout='auto',
-            timeout=10,
-            barge_in=True  # Enable barge-in to interrupt while speaking
-        )
-        
-        # Add the agent's response to the gather
-        gather.say(agent_response, voice='Polly.Amy')
-        response.append(gather)
+        agent_response = submit(_run_agent_async(transcribed_text))
         
-        # Fallback if no speech is detected after the response
-        response.say("I didn't hear anything. Please try again.", voice='Polly.Amy')
-        response.redirect('/lgch_todo/twilio/call?is_continuation=true')
+        # Return TwiML with the agent's response inside a barge-in Gather
+        twiml = _twiml_documents(_twiml_base_url())["gather"].format(say=xml_escape(agent_response))
         
-        print(f"Generated TwiML response: {str(response)}")
-        return Response(str(response), mimetype='text/xml')
+        print(f"Generated TwiML response: {twiml}")
+        return _twiml_response(twiml)
         
+    except TimeoutError:
+        print(f"Agent run timed out after {AGENT_TIMEOUT}s processing audio")
+        return _twiml_response(_twiml_documents(_twiml_base_url())["error"])
     except Exception as e:
         print(f"Error processing audio: {e}")
-        response = VoiceResponse()
-        
-        # Use Gather with barge-in for error messages too
-        gather = Gather(
-            input='speech',
-            action='/lgch_todo/twilio/process_audio',
-            method='POST',
-            speech_timeout='auto',
-            timeout=10,
-            barge_in=True
-        )
-        gather.say("I'm sorry, I encountered an error processing your request. Please try again.", voice='Polly.Amy')
-        response.append(gather)
-        
-        # Fallback
-        response.say("I didn't hear anything. Please try again.", voice='Polly.Amy')
-        response.redirect('/lgch_todo/twilio/call?is_continuation=true')
-        return Response(str(response), mimetype='text/xml')
+        return _twiml_response(_twiml_documents(_twiml_base_url())["error"])
 
 # WebSocket server is now handled by a separate process
 # See websocket_server.py for the Twilio voice streaming implementation
@@ -217,57 +231,89 @@ def index():
     return "LGCH Todo: LangGraph + MCP integration is ready. POST to /lgch_todo/run_agent with JSON {prompt: str}."
 
 
-async def _get_agent_graph() -> StateGraph:
-    """Helper to initialize the agent graph with tools."""
-    config_path = os.path.join(os.path.dirname(__file__), 'mcps', 'mcp_config.json')
-    if not os.path.exists(config_path):
-        # Fallback path for when running from the root directory
-        config_path = os.path.join('lgch_todo', 'mcps', 'mcp_config.json')
+# --- Shared agent event loop ---
+# Agent runs are submitted to one long-lived event loop thread per worker process instead of a fresh
+# asyncio.run() per request, so the compiled graph and its HTTP clients survive between requests.
+_agent_loop: Optional[asyncio.AbstractEventLoop] = None
+_agent_loop_pid: Optional[int] = None
+_agent_loop_lock = threading.Lock()
 
-    with open(config_path) as f:
-        mcp_config = json.load(f)
-    
-    # Set working directory to project root for MCP servers
-    # __file__ is: /Users/hj/Web Development Projects/1. Main/lgch_todo/routes.py
-    # We need: /Users/hj/Web Development Projects/1. Main
-    project_root = os.path.dirname(os.path.dirname(__file__))
-    original_cwd = os.getcwd()
-    os.chdir(project_root)
-    
-    # Update the MCP config with absolute paths
-    for server_name, server_config in mcp_config["mcpServers"].items():
-        if "args" in server_config and len(server_config["args"]) > 0:
-            # Convert relative path to absolute path
-            relative_path = server_config["args"][0]
-            if not os.path.isabs(relative_path):
-                absolute_path = os.path.join(project_root, relative_path)
-                server_config["args"][0] = absolute_path
-    
+
+def _get_agent_loop() -> asyncio.AbstractEventLoop:
+    """Return this process's agent loop, starting its thread on first use (and again after a fork)."""
+    global _agent_loop, _agent_loop_pid
+    with _agent_loop_lock:
+        if _agent_loop is None or _agent_loop_pid != os.getpid():
+            _agent_loop = asyncio.new_event_loop()
+            _agent_loop_pid = os.getpid()
+            threading.Thread(target=_agent_loop.run_forever, name="lgch-agent-loop", daemon=True).start()
+        return _agent_loop
+
+
+# Replies to repeated prompts that needed no tools (greetings, help, small talk) are reused for
+# AGENT_CACHE_TTL seconds. Only touched from the agent loop thread, so it needs no lock.
+AGENT_CACHE_TTL = float(os.getenv('AGENT_CACHE_TTL', 300))
+_response_cache: TTLCache = TTLCache(maxsize=256, ttl=max(AGENT_CACHE_TTL, 1))
+
+
+# Longest a request thread waits on an agent run; kept under gunicorn's worker timeout so a hung
+# agent or MCP call fails the request instead of getting the whole worker killed
+AGENT_TIMEOUT = float(os.getenv('AGENT_TIMEOUT', 60))
+
+
+def submit(coro, timeout: float = AGENT_TIMEOUT):
+    """Run a coroutine on the shared agent loop and block until it returns.
+
+    Raises TimeoutError (after cancelling the run) if it takes longer than timeout seconds.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_agent_loop())
     try:
-        client = MultiServerMCPClient(connections=mcp_config["mcpServers"])
-        tools = await client.get_tools()
-        return TodoAgent(tools=tools).build_graph()
-    finally:
-        os.chdir(original_cwd)
+        return future.result(timeout)
+    except TimeoutError:
+        future.cancel()
+        raise
+
+
+def _response_cache_key(prompt: str) -> str:
+    return " ".join(prompt.lower().split())
 
 
 async def _run_agent_async(prompt: str) -> str:
     """Runs the agent for a given prompt and returns the final response."""
-    agent_graph = await _get_agent_graph()
+    from langchain_core.messages import HumanMessage, ToolMessage
+    from .assistant_graph_todo import CHECKPOINT_DURABILITY
+    from .state import AgentState
+
+    cache_key = _response_cache_key(prompt)
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    agent_graph = await get_shared_agent()
 
     input_state = AgentState(
         messages=[HumanMessage(content=prompt)],
         customer_id=""
     )
-    config = {"configurable": {"thread_id": "flask-thread-1"}}
+    # The compiled graph (and its checkpointer) is shared, so each run gets its own thread
+    config = {"configurable": {"thread_id": f"flask-{uuid4()}"}}
 
-    # Stream through the graph to execute the agent logic
-    async for _ in agent_graph.astream(input=input_state, stream_mode="values", config=config):
-        pass
+    try:
+        # Stream through the graph to execute the agent logic
+        async for _ in agent_graph.astream(
+            input=input_state, stream_mode="values", config=config, durability=CHECKPOINT_DURABILITY
+        ):
+            pass
 
-    final_state = agent_graph.get_state(config=config)
-    last_message = final_state.values.get("messages")[-1]
-    return getattr(last_message, 'content', "")
+        final_state = agent_graph.get_state(config=config)
+        messages = final_state.values.get("messages")
+        result = getattr(messages[-1], 'content', "")
+        # Answers that touched a tool depend on (or changed) the database, so only cache pure LLM replies
+        if AGENT_CACHE_TTL > 0 and not any(isinstance(message, ToolMessage) for message in messages):
+            _response_cache[cache_key] = result
+        return result
+    finally:
+        await agent_graph.checkpointer.adelete_thread(config["configurable"]["thread_id"])
 
 
 @lgch_todo_bp.route('/run_agent', methods=['POST'])
@@ -278,8 +324,11 @@ def run_agent():
         return jsonify({"error": "Missing 'prompt' in JSON body"}), 400
 
     try:
-        result = asyncio.run(_run_agent_async(prompt))
+        result = submit(_run_agent_async(prompt))
         return jsonify({"result": result})
+    except TimeoutError:
+        print(f"Agent run timed out after {AGENT_TIMEOUT}s in /run_agent")
+        return jsonify({"error": "Agent run timed out"}), 504
     except Exception as e:
         # Log the full error for debugging
         print(f"Error in /run_agent: {e}")
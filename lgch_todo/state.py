@@ -1,8 +1,9 @@
+from langchain_core.messages import BaseMessage
 from langgraph.graph import add_messages
 from pydantic import BaseModel
 from typing import Annotated, List
 
 
 class AgentState(BaseModel):
-    messages: Annotated[List, add_messages] = []
+    messages: Annotated[List[BaseMessage], add_messages] = []
     customer_id: str = ""
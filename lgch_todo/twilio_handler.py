@@ -1,35 +1,146 @@
 import asyncio
 import base64
-import json
 import logging
-import websockets
 import os
 import wave
 from datetime import datetime
 from typing import AsyncGenerator
+from uuid import uuid4
 import numpy as np
+import orjson
+from aiohttp import web, WSMsgType
 
 from langchain_core.messages import AIMessage, HumanMessage
 from langgraph.graph import StateGraph
 
-from .assistant_graph_todo import TodoAgent
-from .voice_utils import play_audio_async_generator
+from .agent_registry import get_shared_agent
+from .assistant_graph_todo import get_agent_graph, CHECKPOINT_DURABILITY
+from .voice_utils import ULAW_TO_PCM16, play_audio_async_generator
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Suppress noisy logs from other libraries
-logging.getLogger("websockets").setLevel(logging.WARNING)
 logging.getLogger("openai").setLevel(logging.WARNING)
 
 
-async def save_call_recording(audio_data: bytes, call_sid: str, from_number: str = None, to_number: str = None) -> str:
-    """Save call recording to file and database.
+# Outgoing media frames are coalesced to this many bytes (~100 ms of 8 kHz μ-law) per send
+MEDIA_FRAME_BYTES = 800
+# The first frames of each utterance are smaller (20, 40, 80 ms) so audio starts sooner
+PROGRESSIVE_FRAME_SIZES = (160, 320, 640, MEDIA_FRAME_BYTES)
+# How long a closed call's remaining turns may keep running (same setting as the Flask routes)
+AGENT_TIMEOUT = float(os.getenv('AGENT_TIMEOUT', 60))
+
+
+class CallRecorder:
+    """Writes a call's μ-law audio to a WAV file as it arrives instead of buffering the whole call."""
+
+    SAMPLE_RATE = 8000  # Twilio Media Streams are 8 kHz μ-law
+
+    def __init__(self, call_sid: str):
+        # Recordings live in <project root>/recordings (where app.py is located)
+        # __file__ is lgch_todo/twilio_handler.py, so go up 2 levels
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        recordings_dir = os.path.join(project_root, "recordings")
+        os.makedirs(recordings_dir, exist_ok=True)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.call_sid = call_sid
+        self.file_path = os.path.join(recordings_dir, f"call_{call_sid}_{timestamp}.wav")
+        self.frames = 0
+
+        self._wav_file = wave.open(self.file_path, 'wb')
+        self._wav_file.setnchannels(1)  # Mono
+        self._wav_file.setsampwidth(2)  # 2 bytes per sample
+        self._wav_file.setframerate(self.SAMPLE_RATE)
+        logger.info(f"Recording call {call_sid} to {self.file_path}")
+
+    def write(self, ulaw_chunk: bytes) -> None:
+        """Decode a μ-law media payload to PCM and append it to the file.
+
+        Called on the event loop: payloads are ~160 bytes and the file is buffered, so a thread
+        hop per chunk would cost more than the write.
+        """
+        self._wav_file.writeframes(ULAW_TO_PCM16[np.frombuffer(ulaw_chunk, dtype=np.uint8)].tobytes())
+        self.frames += len(ulaw_chunk)
+
+    def finish(self) -> int:
+        """Close the file (patching the WAV header) and return its size in bytes."""
+        self._wav_file.close()
+        return os.path.getsize(self.file_path)
+
+    @property
+    def duration_seconds(self) -> int:
+        return self.frames // self.SAMPLE_RATE
+
+
+class UtteranceDetector:
+    """Splits a call's inbound μ-law audio into caller utterances with a simple energy-based VAD.
+
+    feed() returns an utterance's audio as soon as END_SILENCE_MS of quiet follows at least
+    MIN_SPEECH_MS of speech, so a turn is transcribed while the call is still going. Leading
+    silence is trimmed to PREROLL_MS so the start of the first word isn't clipped, and no
+    utterance grows past MAX_UTTERANCE_MS.
+    """
+
+    FRAME_BYTES = 160  # 20 ms of 8 kHz μ-law, the size of a Twilio media payload
+    SPEECH_RMS = 500.0  # 16-bit PCM level separating speech from line noise
+    END_SILENCE_MS = 700
+    MIN_SPEECH_MS = 200
+    PREROLL_MS = 200
+    MAX_UTTERANCE_MS = 30000  # a turn is cut here even without a pause (e.g. a noisy line), bounding the buffer
+
+    def __init__(self):
+        self._audio = bytearray()
+        self._pending = bytearray()
+        self._speech_frames = 0
+        self._silent_frames = 0
+        self._end_frames = self.END_SILENCE_MS // 20
+        self._min_frames = self.MIN_SPEECH_MS // 20
+        self._preroll_bytes = self.PREROLL_MS // 20 * self.FRAME_BYTES
+        self._max_bytes = self.MAX_UTTERANCE_MS // 20 * self.FRAME_BYTES
+
+    def feed(self, ulaw_chunk: bytes) -> bytearray | None:
+        """Add a media payload; return the finished utterance when this chunk ends one."""
+        self._pending.extend(ulaw_chunk)
+        utterance = None
+        while len(self._pending) >= self.FRAME_BYTES:
+            frame = self._pending[:self.FRAME_BYTES]
+            del self._pending[:self.FRAME_BYTES]
+            self._audio.extend(frame)
+
+            pcm = ULAW_TO_PCM16[np.frombuffer(frame, dtype=np.uint8)].astype(np.float32)
+            if np.sqrt(np.mean(pcm * pcm)) >= self.SPEECH_RMS:
+                self._speech_frames += 1
+                self._silent_frames = 0
+            elif self._speech_frames:
+                self._silent_frames += 1
+
+            if not self._speech_frames:
+                del self._audio[:-self._preroll_bytes]
+            elif self._silent_frames >= self._end_frames or len(self._audio) >= self._max_bytes:
+                if self._speech_frames >= self._min_frames:
+                    utterance, self._audio = self._audio, bytearray()
+                else:
+                    del self._audio[:-self._preroll_bytes]  # a click or cough, not speech
+                self._speech_frames = self._silent_frames = 0
+        return utterance
+
+    def flush(self) -> bytearray | None:
+        """Return whatever speech is still buffered (e.g. when the stream stops) and reset."""
+        utterance = self._audio if self._speech_frames >= self._min_frames else None
+        self._audio = bytearray()
+        self._pending.clear()
+        self._speech_frames = self._silent_frames = 0
+        return utterance
+
+
+async def save_call_recording(recorder: CallRecorder, from_number: str = None, to_number: str = None) -> str:
+    """Finish a call recording and save it to the database.
     
     Args:
-        audio_data: Raw audio data from Twilio
-        call_sid: Twilio Call SID
+        recorder: The call's recorder; its WAV file is closed here
         from_number: Caller's phone number
         to_number: Called phone number
         
@@ -37,91 +148,41 @@ async def save_call_recording(audio_data: bytes, call_sid: str, from_number: str
         Path to the saved recording file
     """
     try:
-        logger.info(f"Starting call recording save for SID: {call_sid}")
-        logger.info(f"Audio data size: {len(audio_data)} bytes")
-        
-        # Validate audio data
-        if not audio_data or len(audio_data) == 0:
-            logger.error("No audio data provided for recording")
-            return None
-        
-        # Create recordings directory if it doesn't exist
-        # Get the project root directory (where app.py is located)
-        # __file__ is lgch_todo/twilio_handler.py
-        # We want to go up 2 levels to get to the project root
-        project_root = os.path.dirname(os.path.dirname(__file__))
-        recordings_dir = os.path.join(project_root, "recordings")
-        logger.info(f"Recordings directory: {recordings_dir}")
-        os.makedirs(recordings_dir, exist_ok=True)
-        
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"call_{call_sid}_{timestamp}.wav"
-        file_path = os.path.join(recordings_dir, filename)
-        logger.info(f"Recording file path: {file_path}")
-        
-        # Convert μ-law audio to WAV format
-        try:
-            # Convert μ-law to linear PCM using numpy
-            ulaw_array = np.frombuffer(audio_data, dtype=np.uint8)
-            # μ-law to linear conversion
-            sign = ((ulaw_array & 0x80) != 0) * -1
-            exponent = (ulaw_array & 0x70) >> 4
-            mantissa = ulaw_array & 0x0F
-            
-            # Reconstruct the linear value
-            linear = np.zeros_like(ulaw_array, dtype=np.int16)
-            for i in range(len(ulaw_array)):
-                if exponent[i] == 0:
-                    linear[i] = (mantissa[i] << 1) + 33
-                else:
-                    linear[i] = ((mantissa[i] << (exponent[i] + 1)) + (1 << (exponent[i] + 2))) - 33
-                
-                if sign[i]:
-                    linear[i] = -linear[i]
-            
-            pcm_audio = linear.tobytes()
-            logger.info(f"Converted audio to PCM: {len(pcm_audio)} bytes")
-        except Exception as e:
-            logger.error(f"Error converting audio format: {e}")
-            return None
-        
-        # Create WAV file
-        try:
-            with wave.open(file_path, 'wb') as wav_file:
-                wav_file.setnchannels(1)  # Mono
-                wav_file.setsampwidth(2)  # 2 bytes per sample
-                wav_file.setframerate(8000)  # 8kHz sample rate
-                wav_file.writeframes(pcm_audio)
-            logger.info(f"WAV file created successfully: {file_path}")
-        except Exception as e:
-            logger.error(f"Error creating WAV file: {e}")
+        # Closing seeks back to patch the header and stats the file; keep that off the event loop
+        file_size = await asyncio.to_thread(recorder.finish)
+        logger.info(f"WAV file closed: {recorder.file_path}")
+
+        if recorder.frames == 0:
+            logger.error("No audio recorded for call")
+            # The file was opened on 'start'; don't leave an empty recording behind
+            try:
+                await asyncio.to_thread(os.remove, recorder.file_path)
+            except OSError as e:
+                logger.warning(f"Could not remove empty recording {recorder.file_path}: {e}")
             return None
-        
-        # Calculate file size and duration
-        file_size = os.path.getsize(file_path)
-        duration_seconds = len(pcm_audio) // (8000 * 2)  # 8kHz, 2 bytes per sample
+
+        duration_seconds = recorder.duration_seconds
         logger.info(f"File size: {file_size} bytes, Duration: {duration_seconds} seconds")
         
         # Save to database
         try:
             from .mcps.local_servers.db_todo import create_call_recording
             await create_call_recording(
-                call_sid=call_sid,
-                recording_path=file_path,
+                call_sid=recorder.call_sid,
+                recording_path=recorder.file_path,
                 from_number=from_number,
                 to_number=to_number,
                 duration_seconds=duration_seconds,
                 file_size_bytes=file_size,
                 status="completed"
             )
-            logger.info(f"Call recording saved to database: {file_path}")
+            logger.info(f"Call recording saved to database: {recorder.file_path}")
         except Exception as e:
             logger.error(f"Failed to save recording to database: {e}")
             import traceback
             logger.error(f"Database error traceback: {traceback.format_exc()}")
         
-        return file_path
+        return recorder.file_path
         
     except Exception as e:
         logger.error(f"Error saving call recording: {e}")
@@ -136,17 +197,23 @@ async def stream_graph_response(
     This is a simplified version for text-only streaming to the console.
     """
     full_response = ""
-    async for chunk in graph.astream(input=input_data, config=config, stream_mode="values"):
+    async for chunk in graph.astream(
+        input=input_data, config=config, stream_mode="values", durability=CHECKPOINT_DURABILITY
+    ):
         if "messages" in chunk:
             message = chunk["messages"][-1]
             if isinstance(message, AIMessage) and message.content:
-                # Yield the new content
-                new_content = message.content.replace(full_response, "")
-                yield new_content
+                # "values" mode yields the cumulative message, so the new content is the suffix
+                if message.content.startswith(full_response):
+                    new_content = message.content[len(full_response):]
+                else:
+                    new_content = message.content  # a different message replaced the previous one
+                if new_content:
+                    yield new_content
                 full_response = message.content
 
 
-async def twilio_handler(websocket):
+async def twilio_handler(websocket: web.WebSocketResponse):
     """
     Handles the Twilio WebSocket connection for a voice call.
     Manages audio streams and interaction with the LangGraph agent.
@@ -155,42 +222,24 @@ async def twilio_handler(websocket):
     logger.info(f"WebSocket type: {type(websocket)}")
 
     # --- Agent and Tools Setup ---
-    # This part is similar to original main.py
-    from langchain_mcp_adapters.client import MultiServerMCPClient
-    import os
-    
+    # The graph and its MCP tools are built once per process and shared between calls
     try:
-        # Get the directory where this file is located (lgch_todo)
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        mcp_config_path = os.path.join(current_dir, "mcps", "mcp_config.json")
-        
-        with open(mcp_config_path) as f:
-            mcp_config = json.load(f)
-
-        # Set working directory to project root for MCP servers
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-        original_cwd = os.getcwd()
-        os.chdir(project_root)
-        
-        try:
-            client = MultiServerMCPClient(connections=mcp_config["mcpServers"])
-            tools = await client.get_tools()
-            agent_graph = TodoAgent(tools=tools).build_graph()
-            logger.info("✅ Agent and tools initialized successfully")
-        finally:
-            os.chdir(original_cwd)
+        agent_graph = await get_shared_agent()
+        logger.info("✅ Agent and tools initialized successfully")
     except Exception as e:
         logger.error(f"❌ Error initializing agent: {e}")
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
         # Create a simple fallback agent without MCP tools
-        agent_graph = TodoAgent(tools=[]).build_graph()
+        agent_graph = get_agent_graph([])
         logger.info("⚠️ Using fallback agent without MCP tools")
 
     # Each call gets a unique thread_id for conversation memory
     # We'll get the call_sid from the Twilio Media Streams 'start' event
     call_sid = None
-    config = {"configurable": {"thread_id": f"twilio-{call_sid or 'unknown'}"}}
+    # The compiled graph is shared between calls, so the pre-'start' thread must be unique per connection
+    config = {"configurable": {"thread_id": f"twilio-{uuid4()}"}}
+    thread_ids = {config["configurable"]["thread_id"]}
     logger.info(f"Using thread_id: {config['configurable']['thread_id']}")
 
     # --- Initial Greeting ---
@@ -220,15 +269,99 @@ async def twilio_handler(websocket):
         logger.error(f"Traceback: {traceback.format_exc()}")
         # Continue without intro audio
 
+    async def respond(turn_audio: bytearray, stream_sid: str) -> None:
+        """Transcribe one caller utterance, run the agent on it and send the reply back to Twilio."""
+        try:
+            # 1. Transcribe the utterance
+            from .voice_utils import transcribe_audio_bytes
+            transcribed_text = await transcribe_audio_bytes(turn_audio)
+
+            if not transcribed_text or len(transcribed_text.strip()) < 2:
+                logger.info(f"Skipping transcription (too short): '{transcribed_text}'")
+                return
+
+            logger.info(f"--- You --- \n{transcribed_text}\n")
+
+            # 2. Get response from the agent
+            agent_input = {"messages": [HumanMessage(content=transcribed_text)]}
+            agent_response_text = ""
+            
+            print("--- Assistant ---\n")
+            async for text_chunk in stream_graph_response(agent_input, agent_graph, config):
+                agent_response_text += text_chunk
+                print(text_chunk, end="", flush=True)
+            print("\n")
+
+            # 3. Send the agent's response back to Twilio
+            if agent_response_text:
+                logger.info("Sending agent response to Twilio...")
+                
+                # Check if WebSocket is still open before sending response
+                if websocket.closed:
+                    logger.warning("WebSocket connection closed before sending response")
+                    return
+                
+                try:
+                    # Send a simple text response
+                    logger.info("Sending text response to Twilio...")
+                    await websocket.send_str(orjson.dumps({
+                        "event": "response",
+                        "streamSid": call_sid,
+                        "text": agent_response_text
+                    }).decode())
+                    logger.info("Successfully sent text response to Twilio")
+                    
+                except ConnectionResetError:
+                    logger.warning("WebSocket connection closed during response sending")
+                except Exception as e:
+                    logger.error(f"Error sending response: {e}")
+                    import traceback
+                    logger.error(f"Traceback: {traceback.format_exc()}")
+
+            # After responding, send a "mark" message to signal completion
+            if websocket.closed:
+                return
+            await websocket.send_str(orjson.dumps({
+                "event": "mark",
+                "streamSid": stream_sid,
+                "mark": { "name": "agent_turn_complete" }
+            }).decode())
+        except Exception as e:
+            logger.error(f"Error processing caller turn: {e}")
+            import traceback
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            # Continue processing other events even if one fails
+
+    # Turns are answered one at a time by a single task, so the receive loop below keeps reading
+    # media (recording, VAD) while Whisper, the agent and the reply run
+    turns: asyncio.Queue = asyncio.Queue()
+
+    async def answer_turns() -> None:
+        while True:
+            turn_audio, stream_sid = await turns.get()
+            try:
+                await respond(turn_audio, stream_sid)
+            finally:
+                turns.task_done()
+
+    turn_task = asyncio.create_task(answer_turns())
+
     # --- Main Interaction Loop ---
-    audio_buffer = bytearray()
-    full_call_audio = bytearray()  # Store entire call audio for recording
+    # Caller turns end when the detector hears enough trailing silence, not when Twilio stops the stream
+    utterances = UtteranceDetector()
+    recorder = None  # Records the entire call to disk, opened on the 'start' event
     from_number = None
     to_number = None
     # https://www.twilio.com/docs/voice/media-streams/websocket-messages#start-message
-    async for message in websocket:
+    async for msg in websocket:
+        if msg.type == WSMsgType.ERROR:
+            logger.error(f"WebSocket error: {websocket.exception()}")
+            break
+        if msg.type != WSMsgType.TEXT:
+            continue
+
         try:
-            data = json.loads(message)
+            data = orjson.loads(msg.data)
             event = data.get("event")
 
             if event == "start":
@@ -238,171 +371,135 @@ async def twilio_handler(websocket):
                 to_number = data.get("to")
                 if call_sid:
                     config = {"configurable": {"thread_id": f"twilio-{call_sid}"}}
+                    thread_ids.add(config["configurable"]["thread_id"])
                     logger.info(f"Updated thread_id with call_sid: {config['configurable']['thread_id']}")
                     logger.info(f"Call from {from_number} to {to_number}")
+                    if recorder is None:
+                        try:
+                            # Creating the directory and file is blocking I/O, so do it in a thread
+                            recorder = await asyncio.to_thread(CallRecorder, call_sid)
+                        except Exception as e:
+                            logger.error(f"Could not start call recording: {e}")
 
             elif event == "media":
+                utterance = None
                 try:
-                    # Append incoming audio chunks to a buffer
                     payload = data["media"]["payload"]
                     audio_chunk = base64.b64decode(payload)
-                    audio_buffer.extend(audio_chunk)
-                    full_call_audio.extend(audio_chunk)  # Store for full call recording
-                    
-                    # Periodic save every 10KB of audio to prevent data loss
-                    if len(full_call_audio) % 10240 == 0 and len(full_call_audio) > 0:
-                        logger.info(f"Periodic audio checkpoint: {len(full_call_audio)} bytes collected")
+                    if recorder is not None:
+                        recorder.write(audio_chunk)  # Appended to the call's WAV file as it arrives
+                    utterance = utterances.feed(audio_chunk)
                 except Exception as e:
                     logger.error(f"Error processing media event: {e}")
                     # Don't let media processing errors crash the handler
+                if utterance is not None:
+                    logger.info("End of caller utterance detected. Processing audio.")
+                    turns.put_nowait((utterance, data.get("streamSid", call_sid)))
 
             elif event == "stop":
-                try:
-                    logger.info("Stop event received. Processing accumulated audio.")
-                    if not audio_buffer:
-                        logger.warning("No audio in buffer to process.")
-                        continue
-
-                    # 1. Transcribe the buffered audio
-                    from .voice_utils import transcribe_audio_bytes
-                    transcribed_text = await transcribe_audio_bytes(bytes(audio_buffer))
-                    audio_buffer.clear() # Clear buffer for next turn
-
-                    if not transcribed_text or len(transcribed_text.strip()) < 2:
-                        logger.info(f"Skipping transcription (too short): '{transcribed_text}'")
-                        continue
-
-                    logger.info(f"--- You --- \n{transcribed_text}\n")
-
-                    # 2. Get response from the agent
-                    agent_input = {"messages": [HumanMessage(content=transcribed_text)]}
-                    agent_response_text = ""
-                    
-                    print("--- Assistant ---\n")
-                    async for text_chunk in stream_graph_response(agent_input, agent_graph, config):
-                        agent_response_text += text_chunk
-                        print(text_chunk, end="", flush=True)
-                    print("\n")
-
-                    # 3. Send the agent's response back to Twilio
-                    if agent_response_text:
-                        logger.info("Sending agent response to Twilio...")
-                        
-                        # Check if WebSocket is still open before sending response
-                        if websocket.close_code is not None:
-                            logger.warning("WebSocket connection closed before sending response")
-                            return
-                        
-                        try:
-                            # Send a simple text response
-                            logger.info("Sending text response to Twilio...")
-                            await websocket.send(json.dumps({
-                                "event": "response",
-                                "streamSid": call_sid,
-                                "text": agent_response_text
-                            }))
-                            logger.info("Successfully sent text response to Twilio")
-                            
-                        except websockets.exceptions.ConnectionClosed:
-                            logger.warning("WebSocket connection closed during response sending")
-                        except Exception as e:
-                            logger.error(f"Error sending response: {e}")
-                            import traceback
-                            logger.error(f"Traceback: {traceback.format_exc()}")
-
-                    # After responding, send a "mark" message to signal completion
-                    await websocket.send(json.dumps({
-                        "event": "mark",
-                        "streamSid": data.get("streamSid", call_sid),
-                        "mark": { "name": "agent_turn_complete" }
-                    }))
-                except Exception as e:
-                    logger.error(f"Error processing stop event: {e}")
-                    import traceback
-                    logger.error(f"Traceback: {traceback.format_exc()}")
-                    # Continue processing other events even if one fails
+                logger.info("Stop event received. Processing any remaining audio.")
+                utterance = utterances.flush()
+                if utterance is None:
+                    logger.info("No pending speech to process.")
+                    continue
+                turns.put_nowait((utterance, data.get("streamSid", call_sid)))
 
         except Exception as e:
             logger.error(f"Error in WebSocket handler: {e}", exc_info=True)
 
-    # Save call recording when WebSocket closes
-    logger.info(f"WebSocket closing. Full call audio size: {len(full_call_audio)} bytes, Call SID: {call_sid}")
-    if full_call_audio and call_sid:
+    # Finish the turns still queued or in flight (including the one flushed on 'stop'), so their
+    # agent runs and tool writes complete; respond() skips the sends once the socket is closed
+    try:
+        await asyncio.wait_for(turns.join(), AGENT_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"Remaining caller turns did not finish within {AGENT_TIMEOUT}s; cancelling them")
+    turn_task.cancel()
+    try:
+        await turn_task
+    except asyncio.CancelledError:
+        pass
+
+    # Finish the call recording when WebSocket closes; the audio is already on disk
+    logger.info(f"WebSocket closing. Recorded audio: {recorder.frames if recorder else 0} bytes, Call SID: {call_sid}")
+    if recorder is not None:
         logger.info("Saving call recording...")
-        try:
-            recording_path = await save_call_recording(
-                audio_data=bytes(full_call_audio),
-                call_sid=call_sid,
-                from_number=from_number,
-                to_number=to_number
-            )
-            if recording_path:
-                logger.info(f"Call recording saved successfully: {recording_path}")
-            else:
-                logger.error("Failed to save call recording")
-        except Exception as e:
-            logger.error(f"Error saving call recording: {e}")
+        recording_path = await save_call_recording(
+            recorder,
+            from_number=from_number,
+            to_number=to_number
+        )
+        if recording_path:
+            logger.info(f"Call recording saved successfully: {recording_path}")
+        else:
+            logger.error("Failed to save call recording")
     else:
-        logger.warning(f"Skipping recording save - Audio: {len(full_call_audio) if full_call_audio else 0} bytes, SID: {call_sid}")
-        
-    # Additional safety: Save recording even if WebSocket doesn't close properly
-    if full_call_audio and call_sid and len(full_call_audio) > 1000:  # Only if we have substantial audio
-        logger.info("Safety save: Attempting to save recording with substantial audio data")
-        try:
-            recording_path = await save_call_recording(
-                audio_data=bytes(full_call_audio),
-                call_sid=f"{call_sid}_safety",
-                from_number=from_number,
-                to_number=to_number
-            )
-            if recording_path:
-                logger.info(f"Safety recording saved: {recording_path}")
-        except Exception as e:
-            logger.error(f"Error in safety recording save: {e}")
+        logger.warning(f"Skipping recording save - no recording was started, SID: {call_sid}")
+
+    # Drop this call's conversation memory from the shared checkpointer
+    for thread_id in thread_ids:
+        await agent_graph.checkpointer.adelete_thread(thread_id)
 
     logger.info("WebSocket connection closed.")
 
 
-async def stream_audio_to_twilio(websocket, stream_sid: str, audio_generator: AsyncGenerator[bytes, None]):
-    """Streams audio chunks from a generator to Twilio as base64 encoded media messages."""
+async def progressive_chunks(
+    audio_generator: AsyncGenerator[bytes, None], sizes: tuple = PROGRESSIVE_FRAME_SIZES
+) -> AsyncGenerator[bytes, None]:
+    """Re-slice an audio stream into frames that start small and grow to the last of `sizes`.
+
+    The first frame goes out as soon as 20 ms of audio is buffered, which cuts time-to-first-audio;
+    later frames are larger so steady-state playback costs fewer sends. Whatever is left when the
+    stream ends is yielded as a final short frame.
+    """
+    buffer = bytearray()
+    step = 0
+    async for chunk in audio_generator:
+        buffer.extend(chunk)
+        while len(buffer) >= sizes[step]:
+            size = sizes[step]
+            yield bytes(buffer[:size])
+            del buffer[:size]
+            step = min(step + 1, len(sizes) - 1)
+    if buffer:
+        yield bytes(buffer)
+
+
+async def stream_audio_to_twilio(websocket: web.WebSocketResponse, stream_sid: str, audio_generator: AsyncGenerator[bytes, None]):
+    """Streams audio chunks from a generator to Twilio as base64 encoded media messages.
+
+    TTS chunks are re-sliced by progressive_chunks, so each call starts its own small-first schedule.
+    Keepalive is handled by the WebSocketResponse heartbeat.
+    """
     try:
-        chunk_count = 0
-        async for audio_chunk in audio_generator:
+        frame_count = 0
+        async for frame in progressive_chunks(audio_generator):
             # Check if WebSocket is still open
-            if websocket.close_code is not None:
+            if websocket.closed:
                 logger.warning("WebSocket connection closed, stopping audio streaming")
                 break
-                
-            # Twilio expects audio in mulaw format, base64 encoded.
-            # For simplicity, we are sending raw audio from OpenAI TTS and letting Twilio handle it.
-            # For production, you would convert to 8-bit PCMU/mulaw.
-            
-            payload = base64.b64encode(audio_chunk).decode("utf-8")
-            
+
+            # Twilio expects 8 kHz mulaw, base64 encoded; play_audio_async_generator already yields that
+            payload = base64.b64encode(frame).decode("ascii")
+
             try:
-                await websocket.send(json.dumps({
+                await websocket.send_str(orjson.dumps({
                     "event": "media",
                     "streamSid": stream_sid,
                     "media": {
                         "payload": payload
                     }
-                }))
-                chunk_count += 1
-                
-                # Send a ping every 10 chunks to keep connection alive
-                if chunk_count % 10 == 0:
-                    await websocket.ping()
-                    
-            except websockets.exceptions.ConnectionClosed:
+                }).decode())
+                frame_count += 1
+            except ConnectionResetError:
                 logger.warning("WebSocket connection closed during audio chunk streaming")
                 break
             except Exception as e:
-                logger.error(f"Error sending audio chunk {chunk_count}: {e}")
+                logger.error(f"Error sending audio frame {frame_count}: {e}")
                 break
-                
-        logger.info(f"Successfully streamed {chunk_count} audio chunks to Twilio")
-        
-    except websockets.exceptions.ConnectionClosed:
+
+        logger.info(f"Successfully streamed {frame_count} audio frames to Twilio")
+
+    except ConnectionResetError:
         logger.warning("WebSocket connection closed during audio streaming")
     except Exception as e:
         logger.error(f"Error streaming audio to Twilio: {e}")
@@ -3,11 +3,14 @@ import io
 import logging
 import numpy as np
 import sounddevice as sd
-from scipy.io.wavfile import write
-from openai import OpenAI, AsyncOpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from openai.helpers import LocalAudioPlayer
 import asyncio
+import contextlib
 import os
+import struct
+import sys
 from datetime import datetime
 
 
@@ -17,89 +20,290 @@ load_dotenv()
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("openai").setLevel(logging.WARNING)
 
-openai_async = AsyncOpenAI()
-openai = OpenAI()
+logger = logging.getLogger(__name__)
+
+try:
+    # libsndfile bindings; optional, recordings are uploaded as FLAC instead of WAV when available
+    import soundfile
+except ImportError:
+    soundfile = None
+
+try:
+    # HTTP/2 multiplexes concurrent Whisper/TTS requests over one TLS connection; needs the optional h2 package
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+# One pooled client for every transcription and TTS request in this process, so requests reuse
+# warm keep-alive connections instead of paying a TLS handshake each
+_openai_http = DefaultAsyncHttpxClient(
+    http2=_HTTP2,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60),
+)
+openai_async = AsyncOpenAI(http_client=_openai_http)
+
+
+# Also send one tiny TTS request at startup so the first caller doesn't pay the speech model's cold start
+TTS_WARMUP = os.getenv("TTS_WARMUP", "true").lower() == "true"
+
+
+async def warm_up_openai() -> None:
+    """Open a connection to the OpenAI API ahead of the first real request (best effort)."""
+    try:
+        await _openai_http.head(str(openai_async.base_url))
+        if TTS_WARMUP:
+            # Same model/voice/format as play_audio_async_generator; the first chunk is enough
+            async with openai_async.audio.speech.with_streaming_response.create(
+                model="gpt-4o-mini-tts",
+                voice="fable",
+                input=".",
+                response_format="pcm",
+            ) as response:
+                async for _ in response.iter_bytes():
+                    break
+    except Exception as e:
+        logger.info(f"OpenAI warm-up failed: {e}")
+
+
+def _build_ulaw_table() -> np.ndarray:
+    """Decode all 256 G.711 μ-law bytes to 16-bit linear PCM (same output as audioop.ulaw2lin)."""
+    ulaw = ~np.arange(256, dtype=np.uint8)
+    exponent = (ulaw >> 4) & 0x07
+    mantissa = (ulaw & 0x0F).astype(np.int32)
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(ulaw & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+# Twilio Media Streams send 8 kHz μ-law; index this table with the raw bytes to get PCM samples
+ULAW_TO_PCM16 = _build_ulaw_table()
+
+
+def _build_pcm16_to_ulaw_table() -> np.ndarray:
+    """μ-law encode every 16-bit sample (same output as audioop.lin2ulaw), indexed by the sample's uint16 bits."""
+    samples = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 2  # 14-bit linear
+    mask = np.where(samples < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(samples), 8159) + 0x21
+    segment = np.searchsorted(np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]), magnitude)
+    ulaw = np.where(segment >= 8, 0x7F, (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F))
+    return (ulaw ^ mask).astype(np.uint8)
+
+
+PCM16_TO_ULAW = _build_pcm16_to_ulaw_table()
+
+TTS_SAMPLE_RATE = 24000  # OpenAI's "pcm" speech format: 24 kHz, 16-bit little-endian, mono
+TWILIO_SAMPLE_RATE = 8000
+
+
+class UlawEncoder:
+    """Converts a stream of 24 kHz PCM chunks to 8 kHz μ-law for Twilio, carrying filter state across chunks.
+
+    A short windowed-sinc low-pass (cut at the 3.4 kHz telephone band) runs before keeping every
+    third sample, so the decimation doesn't alias; the 16-bit samples are then encoded with one
+    lookup in PCM16_TO_ULAW.
+    """
+
+    DECIMATION = TTS_SAMPLE_RATE // TWILIO_SAMPLE_RATE
+    TAPS = 31
+
+    def __init__(self):
+        n = np.arange(self.TAPS) - (self.TAPS - 1) / 2
+        cutoff = 3400 / TTS_SAMPLE_RATE
+        taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(self.TAPS)
+        self._taps = (taps / taps.sum()).astype(np.float32)
+        self._history = np.zeros(self.TAPS - 1, dtype=np.float32)
+        self._odd_byte = b""
+        self._samples_seen = 0
+
+    def encode(self, pcm_chunk: bytes) -> bytes:
+        data = self._odd_byte + pcm_chunk if self._odd_byte else pcm_chunk
+        usable = len(data) & ~1  # network chunks can split a sample
+        self._odd_byte = data[usable:]
+        if not usable:
+            return b""
+
+        samples = np.frombuffer(data, dtype='<i2', count=usable // 2).astype(np.float32)
+        padded = np.concatenate((self._history, samples))
+        filtered = np.convolve(padded, self._taps, mode='valid')
+        self._history = padded[-(self.TAPS - 1):]
+
+        # Keep the samples whose position in the whole stream is a multiple of DECIMATION
+        start = -self._samples_seen % self.DECIMATION
+        self._samples_seen += len(filtered)
+        decimated = np.clip(np.rint(filtered[start::self.DECIMATION]), -32768, 32767).astype(np.int16)
+        return PCM16_TO_ULAW[decimated.view(np.uint16)].tobytes()
+
+
+# Recordings are uploaded to Whisper in segments of about this length while the user is still speaking
+SEGMENT_SECONDS = 10
+# Each cut is moved to the quietest 20 ms within this many seconds of the boundary, so it falls in a
+# pause between words rather than through one
+CUT_SEARCH_SECONDS = 1
+
+
+def _quietest_block(samples: np.ndarray, block: int) -> int:
+    """Offset of the middle of the lowest-energy `block`-sample block in `samples`."""
+    usable = len(samples) // block * block
+    blocks = samples[:usable].astype(np.float32).reshape(-1, block)
+    return int(np.argmin(np.einsum('ij,ij->i', blocks, blocks))) * block + block // 2
+
+
+def _encode_for_upload(samples: np.ndarray, sample_rate: int) -> io.BytesIO:
+    """Encodes int16 samples for Whisper: lossless FLAC (about half the bytes) when soundfile is installed, else WAV."""
+    if soundfile is not None:
+        upload = io.BytesIO()
+        soundfile.write(upload, samples, sample_rate, format='FLAC', subtype='PCM_16')
+        upload.seek(0)
+        upload.name = "audio.flac"
+    else:
+        upload = io.BytesIO(_wav_header(samples.nbytes, sample_rate) + samples.tobytes())
+        upload.name = "audio.wav"
+    return upload
+
+
+async def _transcribe_segment(samples: np.ndarray, sample_rate: int, previous: "asyncio.Task | None") -> str:
+    """Transcribes one recorded segment, prompted with the previous segment's text for context and spelling."""
+    prompt = await previous if previous is not None else ""
+    segment = _encode_for_upload(samples, sample_rate)
+    transcription = await openai_async.audio.transcriptions.create(
+        model="whisper-1",
+        file=segment,
+        **({"prompt": prompt[-500:]} if prompt else {}),
+    )
+    return transcription.text
 
 
 async def record_audio_until_stop():
-    """Records audio from the microphone until Enter is pressed, then saves it to a .wav file."""
+    """Records audio from the microphone until Enter is pressed, then saves it to a .wav file.
 
-    audio_data = []  # List to store audio chunks
-    recording = True  # Flag to control recording
-    sample_rate = 16000 # (kHz) Adequate for human voice frequency
+    About every SEGMENT_SECONDS of audio is sent to Whisper as soon as it is recorded, so when Enter
+    is pressed only the last (partial) segment is still waiting on a transcription. Segments are
+    cut at the quietest point near each boundary, so words aren't split between two requests.
+    """
 
-    def record_audio():
-        """Continuously records audio until the recording flag is set to False."""
-        nonlocal audio_data, recording
-        # This sounddevice stream read is blocking, so it will run in the executor thread
-        with sd.InputStream(samplerate=sample_rate, channels=1, dtype='int16') as stream:
-            while recording:
-                audio_chunk, _ = stream.read(1024)  # Read audio data in chunks
-                audio_data.append(audio_chunk)
-
-    def stop_recording():
-        """Waits for user input to stop the recording."""
-        # This input() call is blocking, so it will run in the executor thread
-        input()  # Wait for Enter key press
-        nonlocal recording
-        recording = False
+    sample_rate = 16000 # (kHz) Adequate for human voice frequency
+    # Samples are copied into one preallocated buffer (a minute to start, doubled when full)
+    # instead of collecting chunks and concatenating them at the end
+    buffer = np.empty((sample_rate * 60, 1), dtype=np.int16)
+    frames = 0
+    segment_start = 0
+    segment_frames = sample_rate * SEGMENT_SECONDS
+    search_frames = sample_rate * CUT_SEARCH_SECONDS
+    cut_block = sample_rate // 50  # 20 ms
+    segments: list[asyncio.Task] = []  # one transcription per segment, each chained to the previous
 
     loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+
+    def start_segment(samples: np.ndarray):
+        previous = segments[-1] if segments else None
+        segments.append(loop.create_task(_transcribe_segment(samples, sample_rate, previous)))
+
+    def on_audio(indata, frame_count, time_info, status):
+        """PortAudio callback (runs on PortAudio's thread): copy the new samples into the buffer."""
+        nonlocal buffer, frames, segment_start
+        end = frames + frame_count
+        if end > len(buffer):
+            grown = np.empty((max(end, 2 * len(buffer)), 1), dtype=np.int16)
+            grown[:frames] = buffer[:frames]
+            buffer = grown
+        # RawInputStream hands over PortAudio's buffer as-is; view it rather than building an ndarray
+        buffer[frames:end, 0] = np.frombuffer(indata, dtype=np.int16)
+        frames = end
+        if frames - segment_start >= segment_frames + search_frames:
+            # Cut at the quietest point within CUT_SEARCH_SECONDS either side of the nominal boundary
+            window_start = segment_start + segment_frames - search_frames
+            cut = window_start + _quietest_block(buffer[window_start:frames, 0], cut_block)
+            # Hand a copy to the event loop; the buffer may be regrown under it
+            loop.call_soon_threadsafe(start_segment, buffer[segment_start:cut].copy())
+            segment_start = cut
+
+    def on_enter():
+        sys.stdin.readline()
+        stop.set()
 
-    # Run the blocking functions in the event loop's default executor
-    stop_task = loop.run_in_executor(None, stop_recording)
-    record_task = loop.run_in_executor(None, record_audio)
+    # PortAudio pushes audio to the callback and the loop watches stdin for Enter, so no thread
+    # has to block in read() or input() and nothing polls a flag
+    with sd.RawInputStream(samplerate=sample_rate, channels=1, dtype='int16', blocksize=1024, callback=on_audio):
+        try:
+            loop.add_reader(sys.stdin.fileno(), on_enter)
+        except (NotImplementedError, OSError):
+            # Event loops without add_reader support for stdin (e.g. Windows): wait for Enter in the executor
+            await loop.run_in_executor(None, input)
+        else:
+            try:
+                await stop.wait()
+            finally:
+                loop.remove_reader(sys.stdin.fileno())
+    # Leaving the with block stops the stream and waits for the last callback
 
-    # Wait for both tasks to complete
-    await stop_task
-    await record_task
+    # Transcribe whatever was recorded since the last full segment
+    if frames > segment_start or not segments:
+        start_segment(buffer[segment_start:frames])
 
-    # Stack all audio chunks into a single NumPy array and write to file
-    audio_data = np.concatenate(audio_data, axis=0)
+    # The recorded samples, as a view into the buffer (no copy)
+    audio_data = buffer[:frames]
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"audio_{timestamp}.wav"
-    with open(filename, "wb") as f:
-        write(f, sample_rate, audio_data)
 
-    # Convert to WAV format in-memory
-    audio_bytes = io.BytesIO()
-    # Use scipy's write function to save to BytesIO (this is fast, doesn't need executor)
-    write(audio_bytes, sample_rate, audio_data)
-    audio_bytes.seek(0)  # Go to the start of the BytesIO buffer
-    audio_bytes.name = "audio.wav" # Set a filename for the in-memory file
+    def save_recording():
+        """Writes the recording to disk as a WAV header followed by the samples themselves."""
+        with open(filename, "wb") as f:
+            f.write(_wav_header(audio_data.nbytes, sample_rate))
+            f.write(audio_data.data)
+            if hasattr(os, "posix_fadvise"):
+                # The archive isn't read back by this process; don't let it crowd the page cache.
+                # DONTNEED only drops clean pages, so write them back first (this runs in the executor).
+                f.flush()
+                os.fdatasync(f.fileno())
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
 
-    # Transcribe via Whisper (async call, no need for executor)
-    transcription = await openai_async.audio.transcriptions.create(
-        model="whisper-1",
-        file=audio_bytes,
+    # Archive the recording in the executor while the last transcription is in flight
+    save_task = loop.run_in_executor(None, save_recording)
+    try:
+        texts = await asyncio.gather(*segments)
+    finally:
+        await save_task
+
+    return " ".join(text.strip() for text in texts if text and text.strip())
+
+
+def _wav_header(data_size: int, sample_rate: int = 8000) -> bytes:
+    """The 44-byte RIFF header for `data_size` bytes of mono 16-bit PCM."""
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,  # PCM, mono, 2-byte blocks, 16 bits
+        b'data', data_size,
     )
 
-    return transcription.text
 
+# Header for Twilio's 8 kHz mono 16-bit audio; only the RIFF and data sizes (offsets 4 and 40) vary
+_TWILIO_WAV_HEADER = _wav_header(0, TWILIO_SAMPLE_RATE)
+_WAV_HEADER_SIZE = len(_TWILIO_WAV_HEADER)
 
-async def transcribe_audio_bytes(audio_bytes: bytes) -> str:
-    """Transcribes raw audio bytes using OpenAI Whisper."""
+
+async def transcribe_audio_bytes(audio_bytes: bytes | bytearray | memoryview) -> str:
+    """Transcribes raw μ-law audio using OpenAI Whisper; any bytes-like buffer is read without copying."""
     if not audio_bytes:
         return ""
 
     try:
-        # Convert μ-law audio to WAV format for Whisper
-        import wave
-        import audioop
-        
-        # Convert μ-law to linear PCM
-        pcm_audio = audioop.ulaw2lin(audio_bytes, 2)  # 2 bytes per sample
+        ulaw = np.frombuffer(audio_bytes, dtype=np.uint8)
+        data_size = 2 * len(ulaw)
         
-        # Create WAV file in memory
-        wav_buffer = io.BytesIO()
-        with wave.open(wav_buffer, 'wb') as wav_file:
-            wav_file.setnchannels(1)  # Mono
-            wav_file.setsampwidth(2)  # 2 bytes per sample
-            wav_file.setframerate(8000)  # 8kHz sample rate
-            wav_file.writeframes(pcm_audio)
+        # Whisper needs a container, but a WAV one is the constant 8 kHz header with its two length
+        # fields patched, followed by the PCM
+        wav = bytearray(_WAV_HEADER_SIZE + data_size)
+        wav[:_WAV_HEADER_SIZE] = _TWILIO_WAV_HEADER
+        struct.pack_into('<I', wav, 4, 36 + data_size)
+        struct.pack_into('<I', wav, 40, data_size)
+        # Convert μ-law to linear PCM with one vectorized table lookup (audioop is gone in Python 3.13),
+        # written straight into the upload buffer after the header
+        np.take(ULAW_TO_PCM16, ulaw, out=np.frombuffer(wav, dtype=np.int16, offset=_WAV_HEADER_SIZE))
         
-        wav_buffer.seek(0)
+        wav_buffer = io.BytesIO(wav)
         wav_buffer.name = "streamed_audio.wav"
         
         transcription = await openai_async.audio.transcriptions.create(
@@ -113,9 +317,14 @@ async def transcribe_audio_bytes(audio_bytes: bytes) -> str:
         return ""
 
 
+def _strip_markdown(message: str) -> str:
+    """Drop bold markers before TTS; most replies have none, so skip the copy when there's nothing to strip."""
+    return message.replace("**", "") if "**" in message else message
+
+
 async def play_audio(message: str):
     """Plays the audio response from the remote graph with OpenAI."""
-    cleaned_message = message.replace("**", "")
+    cleaned_message = _strip_markdown(message)
 
     async with openai_async.audio.speech.with_streaming_response.create(
         model="gpt-4o-mini-tts",
@@ -127,15 +336,18 @@ async def play_audio(message: str):
     ) as response:
         await LocalAudioPlayer().play(response)
 
+# TTS chunks buffered ahead of a slow consumer (e.g. the Twilio WebSocket)
+TTS_PREFETCH_CHUNKS = 8
+
 async def play_audio_async_generator(message: str, stream: bool = True):
     """
     Generates audio from text and yields it in chunks as an async generator.
-    This is suitable for streaming audio to services like Twilio.
+    Chunks are 8 kHz μ-law, ready to send to Twilio Media Streams.
     """
     if not stream:
         raise ValueError("This function is designed for streaming (stream=True).")
 
-    cleaned_message = message.replace("**", "")
+    cleaned_message = _strip_markdown(message)
 
     async with openai_async.audio.speech.with_streaming_response.create(
         model="gpt-4o-mini-tts",
@@ -144,5 +356,29 @@ async def play_audio_async_generator(message: str, stream: bool = True):
         response_format="pcm", # Use supported PCM format
         speed=1.2,
     ) as response:
-        async for chunk in response.iter_bytes():
-            yield chunk
\ No newline at end of file
+        # Read the HTTP stream in a separate task so downloading the next chunks overlaps with the
+        # caller sending the current one; the bounded queue keeps at most TTS_PREFETCH_CHUNKS ahead
+        queue: asyncio.Queue = asyncio.Queue(maxsize=TTS_PREFETCH_CHUNKS)
+
+        async def fill():
+            try:
+                async for chunk in response.iter_bytes():
+                    await queue.put(chunk)
+            except Exception as e:
+                await queue.put(e)
+            else:
+                await queue.put(None)
+
+        fill_task = asyncio.create_task(fill())
+        encoder = UlawEncoder()
+        try:
+            while (chunk := await queue.get()) is not None:
+                if isinstance(chunk, Exception):
+                    raise chunk
+                ulaw = encoder.encode(chunk)
+                if ulaw:
+                    yield ulaw
+        finally:
+            fill_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await fill_task
\ No newline at end of file
@@ -5,83 +5,146 @@ This is required for Twilio to connect to local servers.
 """
 
 import subprocess
+import threading
 import time
 import json
 import requests
 import sys
 import os
 
-def get_ngrok_tunnels():
+import psutil
+
+NGROK_API_URL = "http://localhost:4040/api/tunnels"
+TUNNEL_TIMEOUT = 15  # seconds to wait for a new tunnel to show up
+
+# Keep-alive session for ngrok API lookups
+_session = requests.Session()
+
+def get_ngrok_tunnels(quiet=False):
     """Get active ngrok tunnels."""
     try:
-        response = requests.get("http://localhost:4040/api/tunnels", timeout=5)
+        response = _session.get(NGROK_API_URL, timeout=5)
         return response.json()
     except Exception as e:
-        print(f"⚠️  Could not connect to ngrok API: {e}")
+        if not quiet:
+            print(f"⚠️  Could not connect to ngrok API: {e}")
         return None
 
-def create_ngrok_tunnel(port, name, protocol="http"):
-    """Create an ngrok tunnel for a specific port."""
+def find_tunnel(tunnels, port, protocol="http"):
+    """Return the public URL of the tunnel forwarding to the given local port, if any."""
+    # Check for various address formats
+    if protocol == "http":
+        addrs = {f'localhost:{port}', f'127.0.0.1:{port}', f'http://localhost:{port}', f'http://127.0.0.1:{port}'}
+    else:  # TCP tunnel
+        addrs = {f'localhost:{port}', f'127.0.0.1:{port}'}
+    for tunnel in (tunnels or {}).get('tunnels', []):
+        if tunnel['config']['addr'] in addrs:
+            return tunnel['public_url']
+    return None
+
+def watch_ngrok_log(process, port, found, ready):
+    """Read ngrok's JSON log until it reports the started tunnel, then keep draining it.
+
+    ngrok logs to the pipe for as long as it runs, so the pipe must be read even after the URL is
+    known or ngrok would eventually block on a full pipe.
+    """
+    for line in process.stdout:
+        if ready.is_set():
+            continue
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if event.get("msg") == "started tunnel" and event.get("url"):
+            found[port] = event["url"]
+            ready.set()
+    ready.set()  # ngrok exited without starting the tunnel
+
+def wait_for_tunnels(processes, timeout=TUNNEL_TIMEOUT):
+    """Wait for each {port: (process, protocol)} tunnel to be announced on its ngrok log.
+
+    Returns {port: public_url}; ports whose tunnel never showed up are missing. Tunnels that weren't
+    announced in time get one last lookup through the ngrok API.
+    """
+    found = {}
+    waits = []
+    for port, (process, _) in processes.items():
+        ready = threading.Event()
+        threading.Thread(target=watch_ngrok_log, args=(process, port, found, ready), daemon=True).start()
+        waits.append(ready)
+    deadline = time.monotonic() + timeout
+    for ready in waits:
+        ready.wait(max(0, deadline - time.monotonic()))
+
+    missing = [port for port in processes if port not in found]
+    if missing:
+        tunnels = get_ngrok_tunnels(quiet=True)
+        for port in missing:
+            public_url = find_tunnel(tunnels, port, processes[port][1])
+            if public_url:
+                found[port] = public_url
+    return found
+
+def stop_ngrok_tunnels(port):
+    """Terminate running ngrok processes whose command line targets this port (in-process, no pkill)."""
+    processes = []
+    for process in psutil.process_iter(['name', 'cmdline']):
+        if (process.info['name'] or '').startswith('ngrok') and str(port) in (process.info['cmdline'] or ()):
+            processes.append(process)
+            try:
+                process.terminate()
+            except psutil.NoSuchProcess:
+                pass
+    _, alive = psutil.wait_procs(processes, timeout=2)
+    for process in alive:
+        try:
+            process.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+def start_ngrok_tunnel(port, name, protocol="http"):
+    """Start the ngrok process for a tunnel to a specific port, without waiting for it."""
     print(f"🔗 Creating ngrok tunnel for {name} on port {port}...")
     
     # Kill any existing tunnels on this port
-    subprocess.run(["pkill", "-f", f"ngrok.*{port}"], check=False)
-    time.sleep(2)
+    stop_ngrok_tunnels(port)
     
-    # Start ngrok tunnel
+    # Start ngrok tunnel; its JSON log on stdout announces the public URL as soon as the tunnel is up
     if protocol == "http":
-        cmd = ["ngrok", "http", str(port), "--log=stdout"]
+        cmd = ["ngrok", "http", str(port), "--log=stdout", "--log-format=json"]
     else:  # tcp for WebSocket
-        cmd = ["ngrok", "tcp", str(port), "--log=stdout"]
+        cmd = ["ngrok", "tcp", str(port), "--log=stdout", "--log-format=json"]
     
     try:
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
-        # Wait for tunnel to be ready
-        print(f"⏳ Waiting for {name} tunnel to initialize...")
-        time.sleep(5)
-        
-        # Get tunnel info with retries
-        for attempt in range(3):
-            tunnels = get_ngrok_tunnels()
-            if tunnels and 'tunnels' in tunnels:
-                print(f"🔍 Found {len(tunnels['tunnels'])} active tunnels")
-                for tunnel in tunnels['tunnels']:
-                    # Check for various address formats
-                    addr = tunnel['config']['addr']
-                    print(f"🔍 Checking tunnel: {addr} (looking for port {port})")
-                    
-                    # Handle both HTTP and TCP tunnels
-                    if protocol == "http":
-                        # HTTP tunnel address formats
-                        if (addr == f'localhost:{port}' or 
-                            addr == f'127.0.0.1:{port}' or 
-                            addr == f'http://localhost:{port}' or
-                            addr == f'http://127.0.0.1:{port}'):
-                            public_url = tunnel['public_url']
-                            print(f"✅ {name} tunnel created: {public_url}")
-                            return public_url, process
-                    else:  # TCP tunnel
-                        # TCP tunnel address formats
-                        if (addr == f'localhost:{port}' or 
-                            addr == f'127.0.0.1:{port}'):
-                            public_url = tunnel['public_url']
-                            print(f"✅ {name} tunnel created: {public_url}")
-                            return public_url, process
-            else:
-                print(f"⚠️  No tunnels found or API error (attempt {attempt + 1}/3)")
-            
-            if attempt < 2:
-                print(f"⏳ Retrying tunnel detection for {name}... (attempt {attempt + 2}/3)")
-                time.sleep(2)
-        
-        print(f"❌ Failed to create {name} tunnel - could not detect tunnel URL")
-        process.terminate()
-        return None, None
-        
+        return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
     except Exception as e:
         print(f"❌ Error creating {name} tunnel: {e}")
-        return None, None
+        return None
+
+def create_ngrok_tunnels(specs):
+    """Start every (port, name, protocol) tunnel at once, then wait for all of them in one polling loop.
+
+    Returns {port: (public_url, process)}, with (None, None) for tunnels that failed.
+    """
+    processes = {port: start_ngrok_tunnel(port, name, protocol) for port, name, protocol in specs}
+    
+    # Wait for the tunnels to be ready
+    print("⏳ Waiting for tunnels to initialize...")
+    urls = wait_for_tunnels({port: (processes[port], protocol) for port, _, protocol in specs if processes[port]})
+    
+    results = {}
+    for port, name, _ in specs:
+        process = processes[port]
+        public_url = urls.get(port)
+        if public_url:
+            print(f"✅ {name} tunnel created: {public_url}")
+            results[port] = (public_url, process)
+        else:
+            if process:
+                print(f"❌ Failed to create {name} tunnel - could not detect tunnel URL")
+                process.terminate()
+            results[port] = (None, None)
+    return results
 
 def check_port_available(port):
     """Check if a port is available (no server running)."""
@@ -120,8 +183,9 @@ def main():
         print("⚠️  WebSocket server is not running. Please start it first with: python lgch_todo/http_websocket_server.py")
     
     # Create tunnels
-    flask_url, flask_process = create_ngrok_tunnel(5000, "Flask Server", "http")
-    websocket_url, websocket_process = create_ngrok_tunnel(5001, "WebSocket Server", "http")
+    tunnels = create_ngrok_tunnels([(5000, "Flask Server", "http"), (5001, "WebSocket Server", "http")])
+    flask_url, flask_process = tunnels[5000]
+    websocket_url, websocket_process = tunnels[5001]
     
     if flask_url:
         print("\n" + "=" * 60)
@@ -141,8 +205,8 @@ def main():
         else:
             print("⚠️  WebSocket tunnel failed - you may need to start the WebSocket server first")
         print(f"📱 Twilio Webhook URL: {flask_url}/lgch_todo/twilio/call")
-        print("\n📋 Update your Twilio webhook URL to:")
-        print(f"   {flask_url}/lgch_todo/twilio/call")
+        print("\n📋 Update your Twilio webhook URL to (the fragment tunes Twilio's connect timeout and retries):")
+        print(f"   {flask_url}/lgch_todo/twilio/call#ct=3000&rc=5&rp=ct")
         print("\n⚠️  Keep this script running while testing Twilio calls!")
         print("=" * 60)
         
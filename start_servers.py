@@ -7,50 +7,96 @@ import subprocess
 import sys
 import time
 import signal
+import socket
+import threading
 import os
 from pathlib import Path
 
+import psutil
+
+# Resolved once: the project's virtual environment, and its Python if present (else this interpreter)
+VENV_PATH = Path.cwd() / "venv"
+VENV_PY = VENV_PATH / "bin" / "python"
+if not VENV_PY.exists():
+    VENV_PY = Path(sys.executable)
+
+def start_server(script):
+    """Start a server script with the virtual environment Python, in its own session.
+
+    The child doesn't get the terminal's Ctrl+C; main() shuts it down explicitly.
+    """
+    return subprocess.Popen([str(VENV_PY), script], cwd=Path.cwd(), close_fds=True, start_new_session=True)
+
 def start_websocket_server():
     """Start the WebSocket server for Twilio voice streaming."""
     print("Starting WebSocket server on port 5001...")
-    # Use the virtual environment Python
-    venv_python = os.path.join(os.getcwd(), "venv", "bin", "python")
-    if os.path.exists(venv_python):
-        websocket_cmd = [venv_python, "lgch_todo/http_websocket_server.py"]
-    else:
-        websocket_cmd = [sys.executable, "lgch_todo/http_websocket_server.py"]
-    return subprocess.Popen(websocket_cmd, cwd=os.getcwd())
+    return start_server("lgch_todo/http_websocket_server.py")
 
 def start_flask_server():
     """Start the Flask server."""
     print("Starting Flask server on port 5000...")
-    # Use the virtual environment Python
-    venv_python = os.path.join(os.getcwd(), "venv", "bin", "python")
-    if os.path.exists(venv_python):
-        flask_cmd = [venv_python, "app.py"]
-    else:
-        flask_cmd = [sys.executable, "app.py"]
-    return subprocess.Popen(flask_cmd, cwd=os.getcwd())
+    return start_server("app.py")
+
+def wait_for_port(port, process, timeout=30):
+    """Wait until something accepts connections on localhost:port, retrying every 20 ms.
+
+    Returns False if the process exits or the timeout passes first.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            if s.connect_ex(('localhost', port)) == 0:
+                return True
+        time.sleep(0.02)
+    return False
+
+def terminate_processes(processes, timeout=2):
+    """Terminate processes, then kill any that haven't exited after `timeout` seconds."""
+    for process in processes:
+        try:
+            process.terminate()
+        except psutil.NoSuchProcess:
+            pass
+    _, alive = psutil.wait_procs(processes, timeout=timeout)
+    for process in alive:
+        try:
+            process.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+def listening_processes(ports):
+    """Processes (other than this one) with a TCP socket listening on any of the given ports.
+
+    Sockets are read per process: the system-wide psutil.net_connections() needs root on macOS,
+    while a user can always inspect their own processes. Processes we may not inspect (or that
+    exit meanwhile) are skipped.
+    """
+    processes = []
+    for proc in psutil.process_iter():
+        if proc.pid == os.getpid():
+            continue
+        try:
+            if any(
+                conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr.port in ports
+                for conn in proc.net_connections(kind='inet')
+            ):
+                processes.append(proc)
+        except (psutil.AccessDenied, psutil.NoSuchProcess, psutil.ZombieProcess):
+            pass
+    return processes
 
 def kill_existing_servers():
     """Kill any existing servers on the required ports."""
     print("🔍 Checking for existing servers...")
     
-    # Kill any existing WebSocket servers
-    try:
-        subprocess.run(["pkill", "-f", "http_websocket_server.py"], check=False)
-        print("✅ Cleaned up existing WebSocket servers")
-    except:
-        pass
-    
-    # Kill any existing Flask servers
-    try:
-        subprocess.run(["pkill", "-f", "app.py"], check=False)
-        print("✅ Cleaned up existing Flask servers")
-    except:
-        pass
+    # Only the processes actually holding the Flask/WebSocket ports, found without shelling out to pkill
+    processes = listening_processes({5000, 5001})
     
-    time.sleep(1)  # Give processes time to terminate
+    if processes:
+        terminate_processes(processes)
+        print(f"✅ Cleaned up {len(processes)} existing server process(es)")
 
 def main():
     """Main function to start both servers."""
@@ -58,11 +104,10 @@ def main():
     print("=" * 60)
     
     # Set up environment for virtual environment
-    venv_path = os.path.join(os.getcwd(), "venv")
-    if os.path.exists(venv_path):
-        print("✅ Using virtual environment:", venv_path)
+    if VENV_PATH.exists():
+        print("✅ Using virtual environment:", VENV_PATH)
         # Add virtual environment to PATH
-        venv_bin = os.path.join(venv_path, "bin")
+        venv_bin = str(VENV_PATH / "bin")
         if venv_bin not in os.environ.get("PATH", ""):
             os.environ["PATH"] = venv_bin + os.pathsep + os.environ.get("PATH", "")
     else:
@@ -71,13 +116,17 @@ def main():
     # Clean up any existing servers
     kill_existing_servers()
     
-    # Start WebSocket server first
+    # Start both servers at once; they don't depend on each other
     websocket_process = start_websocket_server()
-    time.sleep(3)  # Give WebSocket server time to start
-    
-    # Start Flask server
     flask_process = start_flask_server()
     
+    # Wait until both are actually listening instead of sleeping a fixed time
+    for name, port, process in (("WebSocket", 5001, websocket_process), ("Flask", 5000, flask_process)):
+        if wait_for_port(port, process):
+            print(f"✅ {name} server is listening on port {port}")
+        else:
+            print(f"⚠️  {name} server is not accepting connections on port {port} yet")
+    
     print("=" * 60)
     print("✅ Both servers are starting up...")
     print("📞 Flask Server: http://localhost:5000")
@@ -86,36 +135,48 @@ def main():
     print("=" * 60)
     print("Press Ctrl+C to stop both servers")
     
+    # Sleep until a child exits (SIGCHLD) or we're asked to stop (SIGINT/SIGTERM) instead of polling
+    wake = threading.Event()
+    shutdown_requested = False
+
+    def request_shutdown(signum, frame):
+        nonlocal shutdown_requested
+        shutdown_requested = True
+        wake.set()
+
+    signal.signal(signal.SIGCHLD, lambda signum, frame: wake.set())
+    signal.signal(signal.SIGINT, request_shutdown)
+    signal.signal(signal.SIGTERM, request_shutdown)
+
+    while True:
+        # Check if processes are still running (also catches an exit before the handler was installed)
+        if websocket_process.poll() is not None:
+            print("❌ WebSocket server stopped unexpectedly")
+            break
+        if flask_process.poll() is not None:
+            print("❌ Flask server stopped unexpectedly")
+            break
+        if shutdown_requested:
+            print("\n🛑 Shutting down servers...")
+            break
+        wake.wait()
+        wake.clear()
+
+    # Terminate both processes (whichever is still running)
+    for process in (websocket_process, flask_process):
+        if process.poll() is None:
+            process.terminate()
+    
+    # Wait for graceful shutdown
     try:
-        # Wait for both processes
-        while True:
-            time.sleep(1)
-            
-            # Check if processes are still running
-            if websocket_process.poll() is not None:
-                print("❌ WebSocket server stopped unexpectedly")
-                break
-            if flask_process.poll() is not None:
-                print("❌ Flask server stopped unexpectedly")
-                break
-                
-    except KeyboardInterrupt:
-        print("\n🛑 Shutting down servers...")
-        
-        # Terminate both processes
-        websocket_process.terminate()
-        flask_process.terminate()
-        
-        # Wait for graceful shutdown
-        try:
-            websocket_process.wait(timeout=5)
-            flask_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            print("⚠️  Force killing processes...")
-            websocket_process.kill()
-            flask_process.kill()
-        
-        print("✅ Servers stopped successfully")
+        websocket_process.wait(timeout=5)
+        flask_process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        print("⚠️  Force killing processes...")
+        websocket_process.kill()
+        flask_process.kill()
+    
+    print("✅ Servers stopped successfully")
 
 if __name__ == "__main__":
     main()